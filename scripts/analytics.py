@@ -0,0 +1,117 @@
+# scripts/analytics.py
+# Vectorized bet analytics: whole cap arrays in, whole series out, one NumPy pass each.
+# Sign convention (matches the site and the email):
+#   + = side A ahead, advantage = (A − B) / B   (Marty: COIN vs BP)
+#   − = side B ahead, advantage = (A − B) / A   (Winslow: BP vs COIN)
+# so |signed| is always "% ahead" = (leader − loser) / loser.
+
+import bisect, datetime as dt
+import numpy as np
+
+A, TIE, B = 1, 0, -1          # leader codes
+EPOCH = dt.date(1970, 1, 1)
+WINDOWS = ("7d", "30d", "90d", "ytd", "inception")
+
+def signed_advantage(a, b):
+    a = np.asarray(a, dtype=float); b = np.asarray(b, dtype=float)
+    diff = a - b
+    denom = np.where(diff >= 0, b, a)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = diff / denom
+    return np.where((diff == 0) | (a == 0) | (b == 0), 0.0, s)
+
+def lag_index(days, lag_days: int):
+    """For every row, the index of the last row on or before (its day − lag_days); 0 if none."""
+    days = np.asarray(days)
+    return np.maximum(np.searchsorted(days, days - lag_days, side="right") - 1, 0)
+
+def zero_crossings(x, y):
+    """Interpolated points where y changes sign between consecutive rows.
+       Returns (i, xc): the crossing lies between rows i and i+1, at x = xc."""
+    x = np.asarray(x, dtype=float); y = np.asarray(y, dtype=float)
+    i = np.flatnonzero((y[:-1] != 0) & (y[:-1] * y[1:] < 0))
+    t = y[i] / (y[i] - y[i + 1])
+    return i, x[i] + t * (x[i + 1] - x[i])
+
+def with_crossings(x, y):
+    """x/y with an exact y=0 point inserted at every sign change (so both colors meet at zero)."""
+    x = np.asarray(x, dtype=float); y = np.asarray(y, dtype=float)
+    i, xc = zero_crossings(x, y)
+    return np.insert(x, i + 1, xc), np.insert(y, i + 1, 0.0)
+
+def day_number(d) -> int:
+    """Day number (days since 1970-01-01) from a date, ISO string or day number."""
+    if isinstance(d, str):
+        d = dt.date.fromisoformat(d)
+    if isinstance(d, dt.date):
+        return (d - EPOCH).days
+    return int(d)
+
+class DateIndex:
+    """Sorted day numbers, built once per load; every lookup is one bisect (O(log n))."""
+
+    def __init__(self, days):
+        self._days = np.asarray(days).tolist()
+
+    def at_or_before(self, d):
+        """Index of the last row on or before `d`, or None if `d` precedes all rows."""
+        i = bisect.bisect_right(self._days, day_number(d)) - 1
+        return i if i >= 0 else None
+
+class Advantage:
+    """Signed-advantage analytics for one bet over date-sorted arrays.
+       days: int day numbers (days since 1970-01-01); a, b: market caps of side A / side B."""
+
+    def __init__(self, days, a, b):
+        self.days = np.asarray(days, dtype=np.int64)
+        self.a = np.asarray(a, dtype=float)
+        self.b = np.asarray(b, dtype=float)
+        self.signed = signed_advantage(self.a, self.b)
+        self.leader = np.sign(self.a - self.b).astype(np.int8)    # A / TIE / B
+        self.ahead = np.abs(self.signed)
+        self.index = DateIndex(self.days)
+
+    def __len__(self):
+        return len(self.days)
+
+    def dates(self):
+        return self.days.astype("datetime64[D]")
+
+    def iso_dates(self, idx=slice(None)):
+        return self.days[idx].astype("datetime64[D]").astype(str).tolist()
+
+    def deltas(self, lag_days: int):
+        """Change in signed advantage vs the last row at least `lag_days` calendar days earlier."""
+        return self.signed - self.signed[lag_index(self.days, lag_days)]
+
+    def since(self, d) -> "Advantage":
+        """The rows dated on or after `d` (date, ISO string or day number)."""
+        i = int(np.searchsorted(self.days, day_number(d), side="left"))
+        return Advantage(self.days[i:], self.a[i:], self.b[i:])
+
+    def value_at(self, d):
+        """Signed advantage on `d` (last row on or before it); None before the first row."""
+        i = self.index.at_or_before(d)
+        return None if i is None else float(self.signed[i])
+
+    def window_start(self, window) -> int:
+        """Row index a window's delta is measured from: "7d"/"30d"/"90d" (or an int of days)
+           → last row at least that many calendar days before the latest row; "ytd" → last row
+           of the previous year; "inception" → first row. Falls back to the first row."""
+        latest = int(self.days[-1])
+        if window == "inception":
+            return 0
+        if window == "ytd":
+            target = dt.date((EPOCH + dt.timedelta(days=latest)).year - 1, 12, 31)
+        else:
+            lag = int(window[:-1]) if isinstance(window, str) else int(window)
+            target = latest - lag
+        i = self.index.at_or_before(target)
+        return 0 if i is None else i
+
+    def delta(self, window) -> float:
+        """Latest signed advantage minus its value at the start of `window` (see window_start)."""
+        return float(self.signed[-1] - self.signed[self.window_start(window)])
+
+    def crossings(self):
+        return zero_crossings(self.days, self.signed)
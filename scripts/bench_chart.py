@@ -0,0 +1,65 @@
+# scripts/bench_chart.py
+# Per-chart render time: build-from-scratch (new figure + draw_chart + savefig + close, as
+# make_chart_png does) vs one persistent ChartRenderer, both writing PNG bytes to memory.
+#   python scripts/bench_chart.py [-n 20] [--rows 5000]
+# --rows uses a synthetic random-walk history of that length instead of data/history.*.
+# "persistent, same range" is the daemon case (same window, new values); "persistent, mixed
+# windows" alternates all-time / 365d / 30d, so the layout is recomputed on every chart.
+
+import argparse, io, time
+
+import email_report
+from bets import load_bets
+
+def synthetic(rows: int, seed: int = 7):
+    import numpy as np
+    from analytics import Advantage
+    rng = np.random.default_rng(seed)
+    days = np.arange(rows, dtype=np.int64) + 19000
+    a = 50e9 * np.exp(np.cumsum(rng.normal(0, 0.03, rows)))
+    b = 90e9 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    return Advantage(days, a, b)
+
+def scratch_png(adv, params) -> bytes:
+    plt = email_report._pyplot()
+    fig = plt.figure(figsize=params["figsize"])
+    email_report.draw_chart(fig, adv, params)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=params["dpi"])
+    plt.close(fig)
+    return buf.getvalue()
+
+def timed(fn, advs, n):
+    fn(advs[0])                                   # warm-up (imports, font cache)
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(advs[i % len(advs)])
+    return (time.perf_counter() - t0) / n * 1000
+
+def main(argv=None):
+    from chart_renderer import ChartRenderer
+    ap = argparse.ArgumentParser(description="scratch vs persistent chart render time")
+    ap.add_argument("-n", type=int, default=20, help="charts per case")
+    ap.add_argument("--rows", type=int, default=0, help="synthetic history length (default: real data)")
+    args = ap.parse_args(argv)
+
+    bet = load_bets()[0]
+    params = email_report.chart_params(bet)
+    adv = synthetic(args.rows) if args.rows else email_report.load_advantage(bet)
+    mixed = [email_report.chart_view(adv, w) for w in ("", "365d", "30d")]
+
+    renderer = ChartRenderer(params)
+    cases = [("scratch, same range", lambda a: scratch_png(a, params), [adv]),
+             ("persistent, same range", renderer.render, [adv]),
+             ("scratch, mixed windows", lambda a: scratch_png(a, params), mixed),
+             ("persistent, mixed windows", renderer.render, mixed)]
+    print(f"{len(adv)} rows, {args.n} charts per case")
+    results = {}
+    for name, fn, advs in cases:
+        results[name] = ms = timed(fn, advs, args.n)
+        print(f"  {name:<26} {ms:8.1f} ms/chart")
+    for kind in ("same range", "mixed windows"):
+        print(f"  speedup, {kind}: {results['scratch, ' + kind] / results['persistent, ' + kind]:.2f}x")
+
+if __name__ == "__main__":
+    main()
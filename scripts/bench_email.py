@@ -0,0 +1,146 @@
+# scripts/bench_email.py
+# Email HTML render rate: the original f-string html_report (kept below, frozen, as the
+# baseline) vs the compiled template (email_template.py).
+#   python scripts/bench_email.py [-n 5000]
+# Cases, per personalized email:
+#   f-string          legacy_html_report() for every recipient
+#   html_report       report_values() + REPORT.render() for every recipient
+#   compiled+partial  report_template() once per bet, then render(greeting=...) per recipient
+#                     (what email_report.main does; today every recipient's greeting is empty)
+
+import argparse, time
+
+from bets import load_bets
+from email_report import (compute_pages_url, days_left, html_report, leader_names, load_advantage,
+                          money_str, pct_str, report_template)
+
+# Baseline: html_report as it was before email_template.py (do not edit; output must match)
+def legacy_html_report(adv, image_url: str, bet) -> str:
+    names = leader_names(bet)
+    latest = len(adv) - 1
+    code = int(adv.leader[latest])
+    leader, ahead = names[code], float(adv.ahead[latest])
+    latest_date = adv.iso_dates(latest)
+
+    # Δ vs 7d (calendar-based: latest vs most recent row <= latest_date - 7 days); O(log n) each
+    delta7 = adv.delta("7d")
+    deltas_html = " • ".join(f"{label}: {pct_str(adv.delta(w))}" for label, w in
+                             (("30d", "30d"), ("90d", "90d"), ("YTD", "ytd"), ("Since start", "inception")))
+
+    a_color, b_color = bet.a.color, bet.b.color
+    leader_color = a_color if code == 1 else b_color
+
+    tail = slice(max(0, len(adv) - 7), None)
+    tr_html = []
+    for d, b_cap, a_cap, code, pct in reversed(list(zip(adv.iso_dates(tail), adv.b[tail].tolist(), adv.a[tail].tolist(),
+                                                        adv.leader[tail].tolist(), adv.ahead[tail].tolist()))):
+        nm = names[code]
+        pill = a_color if code == 1 else b_color
+        tr_html.append(
+            f"<tr>"
+            f"<td style='padding:8px;border-bottom:1px solid #e5e7eb'>{d}</td>"
+            f"<td style='padding:8px;border-bottom:1px solid #e5e7eb'>{money_str(b_cap)}</td>"
+            f"<td style='padding:8px;border-bottom:1px solid #e5e7eb'>{money_str(a_cap)}</td>"
+            f"<td style='padding:8px;border-bottom:1px solid #e5e7eb'>{nm}</td>"
+            f"<td style='padding:8px;border-bottom:1px solid #e5e7eb'>"
+            f"<span style='border:1px solid {pill};border-radius:999px;padding:3px 8px;color:{pill};font-size:12px'>{pct_str(pct)}</span>"
+            f"</td></tr>"
+        )
+
+    pages = compute_pages_url()
+    link_html = (f"<p style='margin:8px 0 0'><a href='{pages}' "
+                 f"style='color:#2563eb;text-decoration:none'>Open the live dashboard →</a></p>") if pages else ""
+
+    img_tag = f"<img src='{image_url}' alt='{bet.title} chart' style='width:100%;max-width:1000px;border-radius:12px;display:block;margin:8px 0'/>" if image_url else ""
+
+    return f"""<!doctype html>
+<html><body style="font-family:-apple-system,Segoe UI,Roboto,Helvetica,Arial,sans-serif;color:#0b1221;background:#ffffff;margin:0;padding:16px;">
+  <div style="max-width:720px;margin:0 auto;">
+    <h2 style="margin:0 0 4px 0;">{bet.title} — Weekly Update</h2>
+    <div style="color:#6b7280;margin-bottom:12px;">{bet.a.ticker} vs {bet.b.ticker} market capitalization • Ends {bet.end_str}</div>
+
+    <div style="background:#f8fafc;border-radius:12px;padding:14px 16px;margin-bottom:12px;">
+      <table role="presentation" style="width:100%;border-collapse:collapse">
+        <tr>
+          <td style="padding:6px 0;width:33%;">
+            <div style="color:#6b7280;font-size:13px;">Days left</div>
+            <div style="font-weight:700;font-size:22px;">{days_left(bet.end_date)}</div>
+          </td>
+          <td style="padding:6px 0;width:33%;">
+            <div style="color:#6b7280;font-size:13px;">Currently winning</div>
+            <div style="font-weight:800;font-size:22px;color:{leader_color}">{leader}</div>
+          </td>
+          <td style="padding:6px 0;width:33%;">
+            <div style="color:#6b7280;font-size:13px;">% ahead</div>
+            <div style="font-weight:700;font-size:22px;">{pct_str(ahead)} <span style="color:#6b7280;font-size:12px">(Δ vs 7d: {pct_str(delta7)})</span></div>
+          </td>
+        </tr>
+      </table>
+      <div style="color:#6b7280;font-size:12px;margin-top:4px">Δ {deltas_html}</div>
+      <div style="color:#6b7280;font-size:12px;margin-top:4px">% ahead = (leader − loser) / loser</div>
+    </div>
+
+    {img_tag}
+
+    <div style="background:#f8fafc;border-radius:12px;padding:14px 16px;margin-top:12px;">
+      <div style="display:flex;justify-content:space-between;align-items:baseline;margin-bottom:8px;">
+        <strong>Last 7 entries</strong>
+        <span style="color:#6b7280;font-size:12px;">Updated {latest_date}</span>
+      </div>
+      <table style="width:100%;border-collapse:collapse;">
+        <thead>
+          <tr>
+            <th align="left" style="padding:8px;border-bottom:1px solid #e5e7eb;">Date</th>
+            <th align="left" style="padding:8px;border-bottom:1px solid #e5e7eb;">{bet.b.ticker} Market Cap</th>
+            <th align="left" style="padding:8px;border-bottom:1px solid #e5e7eb;">{bet.a.ticker} Market Cap</th>
+            <th align="left" style="padding:8px;border-bottom:1px solid #e5e7eb;">Leader</th>
+            <th align="left" style="padding:8px;border-bottom:1px solid #e5e7eb;">% Ahead</th>
+          </tr>
+        </thead>
+        <tbody>
+          {''.join(tr_html)}
+        </tbody>
+      </table>
+      {link_html}
+    </div>
+
+    <div style="color:#6b7280;font-size:12px;margin-top:12px;">This email was sent automatically by GitHub Actions using Brevo.</div>
+  </div>
+</body></html>"""
+
+def rate(fn, n):
+    fn(0)                                         # warm-up
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return n / (time.perf_counter() - t0)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="f-string vs compiled-template email rendering")
+    ap.add_argument("-n", type=int, default=5000, help="emails per case")
+    args = ap.parse_args(argv)
+
+    bet = load_bets()[0]
+    adv = load_advantage(bet)
+    url = "https://example.github.io/mvw/images/weekly-chart.png"
+    greeting = lambda i: f"<p>Hi reader {i},</p>"
+
+    base = legacy_html_report(adv, url, bet)
+    tpl = report_template(adv, url, bet)
+    if html_report(adv, url, bet) != base or tpl.render() != base:
+        raise SystemExit("template output differs from the f-string html_report")
+
+    cases = [("f-string", lambda i: legacy_html_report(adv, url, bet)),
+             ("html_report", lambda i: html_report(adv, url, bet, greeting(i))),
+             ("compiled+partial", lambda i: report_template(adv, url, bet).render(greeting=greeting(i)) if i == 0
+                                            else tpl.render(greeting=greeting(i)))]
+    print(f"{args.n} emails per case, {len(base)} bytes each (output identical to the f-string version)")
+    results = {}
+    for name, fn in cases:
+        results[name] = r = rate(fn, args.n)
+        print(f"  {name:<17} {r:10,.0f} emails/s")
+    print(f"  speedup vs f-string: html_report {results['html_report'] / results['f-string']:.2f}x, "
+          f"compiled+partial {results['compiled+partial'] / results['f-string']:.1f}x")
+
+if __name__ == "__main__":
+    main()
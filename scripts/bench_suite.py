@@ -0,0 +1,230 @@
+# scripts/bench_suite.py
+# Scaling benchmarks for the report/chart pipeline on synthetic histories.
+#   python scripts/bench_suite.py run [--sizes 1k,100k,10M] [--bets 10] [--out F] [--compare BASE.json]
+#   python scripts/bench_suite.py compare BASE.json NEW.json [--threshold 1.25]
+# (also: python scripts/mvw.py bench ...)
+#
+# For every size it writes a synthetic history (one random-walk market-cap column per ticker,
+# ~1% missing values, `--bets` bets over bets+1 tickers) to a temp dir as history.bin, plus
+# history.json up to --json-max-rows. It then times each stage with the real functions:
+#   json_load            json.load of history.json          (the pre-columnar main() path)
+#   clean_rows           email_report.clean_rows
+#   load_columns_json    email_report.load_columns, JSON fallback
+#   load_columns_bin     email_report.load_columns, memory-mapped history.bin
+#   load_advantage       email_report.load_advantage for every bet (one kept at a time)
+#   deltas               Advantage.delta over analytics.WINDOWS        ┐
+#   downsample           downsample.downsample at the chart's budget    │ first bet
+#   make_chart_png       email_report.make_chart_png (+ output stage)   │ (the rest scale
+#   html_report          email_report.html_report                       │ linearly per bet)
+#   build_summary        build_summary.build_summary                    ┘
+# Time is the best of --repeat untraced runs (1 above 100k rows). Peak memory comes from a
+# separate run under tracemalloc: Python + numpy heap allocations, so memory-mapped pages
+# are not counted. JSON stages above --json-max-rows are recorded as skipped (10M dict rows
+# need far more RAM than the arrays). Beyond 40,000 rows, synthetic days repeat (several
+# samples per day, like intraday data) so every date stays a real calendar date.
+# Results: JSON with the commit, environment and one record per (stage, rows, bets);
+# `compare` flags stages whose time or peak grew by more than --threshold (exit status 1).
+
+import argparse, datetime as dt, json, os, platform, subprocess, sys, tempfile, time, tracemalloc
+from pathlib import Path
+
+import email_report
+from bets import Bet, Party
+
+DEFAULT_OUT = email_report.ROOT / ".cache" / "bench"
+MAX_SPAN_DAYS = 40_000
+STAGES = ("json_load", "clean_rows", "load_columns_json", "load_columns_bin", "load_advantage",
+          "deltas", "downsample", "make_chart_png", "html_report", "build_summary")
+JSON_STAGES = {"json_load", "clean_rows", "load_columns_json"}
+
+def parse_size(s: str) -> int:
+    s = s.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(s[-1:], 1)
+    return int(float(s.rstrip("km")) * mult)
+
+def synthetic_bets(n: int):
+    tickers = [f"T{i:03d}" for i in range(n + 1)]
+    return [Bet(id=f"bench-{i}", title=f"Bench {i}", end_date=dt.date(2030, 5, 1),
+                a=Party(f"A{i}", tickers[i], "#184FF8"), b=Party(f"B{i}", tickers[i + 1], "#007F01"))
+            for i in range(n)]
+
+def write_history(work: Path, rows: int, bets, json_max: int, seed: int = 7):
+    """history.bin (+ history.json if rows <= json_max) in `work`; one column in memory at a time."""
+    import numpy as np
+    import columnar
+    from bets import column
+    span = min(rows, MAX_SPAN_DAYS)
+    end = (dt.date.today() - columnar.EPOCH).days
+    days = (end - span + 1 + np.arange(rows, dtype=np.int64) * span // rows).astype(np.int32)
+    names = list(dict.fromkeys(column(t) for b in bets for t in (b.a.ticker, b.b.ticker)))
+
+    def col(i):
+        r = np.random.default_rng([seed, i])
+        walk = np.cumsum(r.normal(0.0, 1.0 / np.sqrt(rows), rows))     # ~N(0, 1) at the end, any size
+        a = (20e9 + 10e9 * i) * np.exp(walk)
+        a[r.random(rows) < 0.01] = np.nan
+        return a
+
+    columnar.write_arrays(work / "history.bin", days, names, (col(i) for i in range(len(names))))
+    if rows <= json_max:
+        iso = days.astype("datetime64[D]").astype(str).tolist()
+        cols = [(n, [None if v != v else round(v) for v in col(i).tolist()]) for i, n in enumerate(names)]
+        with open(work / "history.json", "w", encoding="utf-8") as f:
+            json.dump([{"date": d, **{n: v[k] for n, v in cols}} for k, d in enumerate(iso)], f)
+
+def stage_fns(work: Path, bets, state: dict):
+    """name -> zero-arg callable; stages share inputs through `state` (filled in order)."""
+    from analytics import WINDOWS
+    from downsample import downsample
+    from build_summary import build_summary
+    params = email_report.chart_params(bets[0])
+
+    def json_load():
+        with open(work / "history.json", "r", encoding="utf-8") as f:
+            state["json"] = json.load(f)
+    def clean_rows():
+        email_report.clean_rows(state["json"])
+    def load_columns_json():
+        email_report.HISTORY_BIN_PATH = work / "missing.bin"
+        try:
+            email_report.load_columns()
+        finally:
+            email_report.HISTORY_BIN_PATH = work / "history.bin"
+    def load_columns_bin():
+        state["columns"] = email_report.load_columns()
+    def load_advantage():
+        state.pop("adv", None)                   # at 10M rows one bet's arrays are ~400 MB
+        for b in bets:
+            adv = email_report.load_advantage(b, state["columns"])
+            state.setdefault("adv", adv)
+            del adv
+    def deltas():
+        [state["adv"].delta(w) for w in WINDOWS]
+    def downsample_():
+        adv = state["adv"]
+        downsample(adv.days, adv.signed * 100.0, params["max_points"])
+    def make_chart_png():
+        email_report.make_chart_png(state["adv"], work / "chart.png", params)
+    def html_report():
+        email_report.html_report(state["adv"], "https://example.invalid/chart.png", bets[0])
+    def build_summary_():
+        build_summary(bets[0], state["columns"])
+
+    return {"json_load": json_load, "clean_rows": clean_rows, "load_columns_json": load_columns_json,
+            "load_columns_bin": load_columns_bin, "load_advantage": load_advantage, "deltas": deltas,
+            "downsample": downsample_, "make_chart_png": make_chart_png, "html_report": html_report,
+            "build_summary": build_summary_}
+
+def measure(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+def run_size(rows: int, bets, args):
+    with tempfile.TemporaryDirectory(prefix="mvw-bench-", dir=args.workdir) as tmp:
+        work = Path(tmp)
+        t0 = time.perf_counter()
+        write_history(work, rows, bets, args.json_max_rows)
+        print(f"{rows:,} rows x {len(bets)} bets: synthetic history in {time.perf_counter() - t0:.1f}s")
+        email_report.HISTORY_PATH, email_report.HISTORY_BIN_PATH = work / "history.json", work / "history.bin"
+        repeat = args.repeat if rows <= 100_000 else 1
+        state, out = {}, []
+        fns = stage_fns(work, bets, state)
+        for name in STAGES:
+            rec = {"stage": name, "rows": rows, "bets": len(bets)}
+            if name in JSON_STAGES and rows > args.json_max_rows:
+                rec["skipped"] = f"rows > --json-max-rows ({args.json_max_rows:,})"
+                print(f"  {name:<18} skipped")
+            else:
+                rec["seconds"], rec["peak_bytes"] = measure(fns[name], repeat)
+                rec["seconds"] = round(rec["seconds"], 6)
+                print(f"  {name:<18} {rec['seconds'] * 1000:10.1f} ms  peak {rec['peak_bytes'] / 1e6:9.1f} MB")
+            out.append(rec)
+        return out
+
+def git_commit() -> str:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=email_report.ROOT, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True, cwd=email_report.ROOT).stdout.strip()
+        return rev + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def environment() -> dict:
+    import numpy, matplotlib
+    return {"python": platform.python_version(), "numpy": numpy.__version__, "matplotlib": matplotlib.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count()}
+
+# ---------- compare ----------
+def compare(base: dict, new: dict, threshold: float, min_seconds: float) -> list:
+    """Print per-stage ratios new/base; returns the regressions (time or peak > threshold)."""
+    old = {(r["stage"], r["rows"], r["bets"]): r for r in base["results"] if "seconds" in r}
+    regressions = []
+    print(f"{base['commit']} -> {new['commit']} (flag > {threshold:g}x)")
+    for r in new["results"]:
+        o = old.get((r["stage"], r["rows"], r["bets"]))
+        if o is None or "seconds" not in r:
+            continue
+        t = r["seconds"] / o["seconds"] if o["seconds"] else float("inf")
+        m = r["peak_bytes"] / o["peak_bytes"] if o["peak_bytes"] else 1.0
+        flag = (t > threshold and o["seconds"] >= min_seconds) or (m > threshold and o["peak_bytes"] >= 1_000_000)
+        print(f"  {r['stage']:<18} {r['rows']:>11,}  time {t:6.2f}x  peak {m:6.2f}x{'  REGRESSION' if flag else ''}")
+        if flag:
+            regressions.append(r)
+    return regressions
+
+def cmd_run(args):
+    sizes = [parse_size(s) for s in args.sizes.split(",")]
+    bets = synthetic_bets(args.bets)
+    result = {"commit": git_commit(), "date": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+              "environment": environment(), "args": {"sizes": sizes, "bets": args.bets, "repeat": args.repeat,
+                                                     "json_max_rows": args.json_max_rows}, "results": []}
+    for rows in sizes:
+        result["results"] += run_size(rows, bets, args)
+    out = args.out or DEFAULT_OUT / f"{result['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=1) + "\n")
+    print(f"Wrote {out}")
+    if args.compare and compare(json.loads(args.compare.read_text()), result, args.threshold, args.min_seconds):
+        sys.exit(1)
+
+def cmd_compare(args):
+    base, new = (json.loads(p.read_text()) for p in (args.base, args.new))
+    if compare(base, new, args.threshold, args.min_seconds):
+        sys.exit(1)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="bench_suite", description="pipeline benchmarks on synthetic histories")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("run", help="run the suite and write JSON results")
+    p.add_argument("--sizes", default="1k,100k,10M", help="comma-separated row counts (k/M suffixes)")
+    p.add_argument("--bets", type=int, default=10)
+    p.add_argument("--repeat", type=int, default=3, help="timed runs per stage up to 100k rows (best is kept)")
+    p.add_argument("--json-max-rows", type=parse_size, default=1_000_000)
+    p.add_argument("--workdir", help="where synthetic histories are written (default: system temp)")
+    p.add_argument("--out", type=Path, help=f"results file (default: {DEFAULT_OUT.relative_to(email_report.ROOT)}/<commit>.json)")
+    p.add_argument("--compare", type=Path, help="baseline results to compare against")
+    p.set_defaults(func=cmd_run)
+    p = sub.add_parser("compare", help="compare two results files")
+    p.add_argument("base", type=Path)
+    p.add_argument("new", type=Path)
+    p.set_defaults(func=cmd_compare)
+    for p in sub.choices.values():
+        p.add_argument("--threshold", type=float, default=1.25, help="flag ratios above this")
+        p.add_argument("--min-seconds", type=float, default=0.005, help="ignore time ratios of faster stages")
+    args = ap.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# scripts/bets.py
+# Declarative bet definitions (data/bets.json, or MVW_BETS=<path>):
+#
+#   [{"id": "marty-vs-winslow", "title": "Marty vs Winslow", "end_date": "2030-05-01",
+#     "chart": "images/weekly-chart.png",               # optional, default images/<id>-chart.png
+#     "recipients": "a@example.com, b@example.com",     # optional, default REPORT_TO_EMAIL(S)
+#     "parties": [{"name": "Marty",   "ticker": "COIN", "color": "#184FF8"},    # side A: + on the chart
+#                 {"name": "Winslow", "ticker": "BP",   "color": "#007F01"}]}]  # side B: − on the chart
+#
+# History rows store one "<ticker lowercased>MarketCap" column per ticker, shared by
+# every bet that uses it, so each ticker is fetched once per run however many bets track it.
+
+import datetime as dt
+import json, os
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BETS_PATH = Path(os.environ.get("MVW_BETS", ROOT / "data" / "bets.json"))
+
+DEFAULT_COLORS = ("#184FF8", "#007F01")   # side A blue, side B green
+
+def column(ticker: str) -> str:
+    return f"{ticker.lower()}MarketCap"
+
+@dataclass(frozen=True)
+class Party:
+    name: str
+    ticker: str
+    color: str
+
+    @property
+    def label(self) -> str:          # "Marty (COIN)"
+        return f"{self.name} ({self.ticker})"
+
+    @property
+    def column(self) -> str:
+        return column(self.ticker)
+
+@dataclass(frozen=True)
+class Bet:
+    id: str
+    title: str
+    end_date: dt.date
+    a: Party                         # side A (leads when the signed advantage is +)
+    b: Party                         # side B
+    chart: str = ""
+    recipients: str = ""
+
+    @property
+    def chart_path(self) -> Path:
+        return ROOT / (self.chart or f"images/{self.id}-chart.png")
+
+    @property
+    def end_str(self) -> str:        # "May 1, 2030"
+        return f"{self.end_date:%B} {self.end_date.day}, {self.end_date.year}"
+
+def load_bets(path: Path = BETS_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    bets = []
+    for b in raw:
+        if len(b.get("parties", [])) != 2:
+            raise ValueError(f"bet {b.get('id')!r}: exactly two parties required")
+        a, other = (Party(p["name"], p["ticker"], p.get("color", default))
+                    for p, default in zip(b["parties"], DEFAULT_COLORS))
+        bets.append(Bet(id=b["id"], title=b.get("title", b["id"]), end_date=dt.date.fromisoformat(b["end_date"]),
+                        a=a, b=other, chart=b.get("chart", ""), recipients=b.get("recipients", "")))
+    if len({b.id for b in bets}) != len(bets):
+        raise ValueError("bet ids must be unique")
+    return bets
+
+def all_tickers(bets):
+    """Every ticker used by any bet, de-duplicated, in first-seen order."""
+    return list(dict.fromkeys(t for b in bets for t in (b.a.ticker, b.b.ticker)))
@@ -0,0 +1,63 @@
+# scripts/build_summary.py
+# Builds data/summary.json: everything index.html needs for first paint, precomputed here so the
+# page makes one small request instead of downloading and reprocessing the full history.
+#   bet       title, end date, parties (label, ticker, color) of the site's bet (first in bets.json)
+#   updated   latest date; leader ("a" | "b" | "tie") + label; ahead (fraction)
+#   deltas    change in signed advantage over 7d / 30d / 90d / ytd / inception (fractions)
+#   points    [[utc_ms, signed_pct], ...] chart series, zero crossings already inserted,
+#             downsampled to at most SITE_POINTS (LTTB, see downsample.py)
+#   maxAbs    symmetric y-axis bound (%)
+#   rows      newest TABLE_ROWS rows [date, b_cap, a_cap, leader, ahead]; totalRows for the rest
+# Run after every history change (fetch_caps.py does), or: python scripts/mvw.py summary
+
+import json, os
+from pathlib import Path
+
+import durable
+from email_report import ROOT, load_advantage, load_columns
+from bets import load_bets
+
+SUMMARY_PATH = ROOT / "data" / "summary.json"
+TABLE_ROWS = 30
+SITE_POINTS = int(os.environ.get("MVW_SITE_POINTS", "1000"))   # ~ widest chart in pixels; 0 = all
+SIDES = {1: "a", -1: "b", 0: "tie"}
+
+def build_summary(bet=None, columns=None) -> dict:
+    import math
+    import numpy as np
+    from analytics import WINDOWS
+    from downsample import downsample
+    bet = bet or load_bets()[0]
+    adv = load_advantage(bet, columns or load_columns())
+    if not len(adv):
+        raise SystemExit("No data rows")
+
+    x, y = downsample(adv.days, adv.signed * 100.0, SITE_POINTS)
+    points = np.column_stack([np.round(x * 86400000), np.round(y, 4)]).tolist()
+    code = int(adv.leader[-1])
+    tail = slice(max(0, len(adv) - TABLE_ROWS), None)
+    rows = [[d, round(b), round(a), SIDES[c], round(p, 6)] for d, b, a, c, p in
+            zip(adv.iso_dates(tail), adv.b[tail].tolist(), adv.a[tail].tolist(),
+                adv.leader[tail].tolist(), adv.ahead[tail].tolist())][::-1]
+    return {
+        "bet": {"id": bet.id, "title": bet.title, "endDate": bet.end_date.isoformat(),
+                "a": {"label": bet.a.label, "ticker": bet.a.ticker, "color": bet.a.color},
+                "b": {"label": bet.b.label, "ticker": bet.b.ticker, "color": bet.b.color}},
+        "updated": adv.iso_dates(-1),
+        "leader": SIDES[code],
+        "leaderLabel": {1: bet.a.label, -1: bet.b.label, 0: "Tied"}[code],
+        "ahead": round(float(adv.ahead[-1]), 6),
+        "deltas": {w: round(adv.delta(w), 6) for w in WINDOWS},
+        "points": [[int(t), v] for t, v in points],
+        "maxAbs": max(5, math.ceil(float(np.abs(adv.signed).max()) * 100 * 1.1)),
+        "rows": rows,
+        "totalRows": len(adv),
+    }
+
+def write_summary(path: Path = SUMMARY_PATH) -> int:
+    data = json.dumps(build_summary(), separators=(",", ":"))
+    durable.write_text(path, data + "\n")
+    return len(data)
+
+if __name__ == "__main__":
+    print(f"Wrote {SUMMARY_PATH.name} ({write_summary()} bytes)")
@@ -0,0 +1,58 @@
+# scripts/chart_output.py
+# Output stage for rendered charts.
+#   PNG (email)  palette-quantized to params["png_colors"] colors (no dithering) and optimized.
+#                The chart is flat colors plus anti-aliased edges, so 32 colors look the same as
+#                the full-color render at about a quarter of the bytes. 0 = keep full color.
+#   SVG (site)   written next to the PNG when params["svg"] is set: text stays <text>, no
+#                timestamp and a fixed id salt, so the same chart gives byte-identical output.
+# Pillow is always present with matplotlib; it is imported only here.
+
+import gzip, io
+from pathlib import Path
+
+import durable
+
+def optimize_png(data: bytes, colors: int) -> bytes:
+    if not colors:
+        return data
+    from PIL import Image
+    im = Image.open(io.BytesIO(data)).convert("RGB")
+    im = im.quantize(colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    out = io.BytesIO()
+    im.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+def svg_bytes(fig) -> bytes:
+    import matplotlib
+    buf = io.BytesIO()
+    with matplotlib.rc_context({"svg.fonttype": "none", "svg.hashsalt": "mvw"}):
+        fig.savefig(buf, format="svg", metadata={"Date": None})
+    return buf.getvalue()
+
+def svg_path(png_path: Path) -> Path:
+    return png_path.with_suffix(".svg")
+
+def save_chart(fig, png_path: Path, params: dict) -> dict:
+    """Write the chart's PNG (and SVG if enabled). Returns byte sizes:
+       {"png_raw", "png"} and, with SVG, {"svg", "svg_gz"} (what a gzip-serving host sends)."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=params["dpi"])
+    raw = buf.getvalue()
+    png = optimize_png(raw, params.get("png_colors", 0))
+    durable.write_bytes(png_path, png)
+    sizes = {"png_raw": len(raw), "png": len(png)}
+    if params.get("svg"):
+        svg = svg_bytes(fig)
+        durable.write_bytes(svg_path(png_path), svg)
+        sizes.update(svg=len(svg), svg_gz=len(gzip.compress(svg, mtime=0)))
+    return sizes
+
+def size_report(sizes: dict) -> str:
+    """'PNG 76.7 KB -> 17.8 KB (-77%), SVG 44.2 KB (9.5 KB gzip)'"""
+    if not sizes:
+        return ""
+    kb = lambda n: f"{n / 1000:.1f} KB"
+    out = f"PNG {kb(sizes['png_raw'])} -> {kb(sizes['png'])} ({sizes['png'] / sizes['png_raw'] - 1:+.0%})"
+    if "svg" in sizes:
+        out += f", SVG {kb(sizes['svg'])} ({kb(sizes['svg_gz'])} gzip)"
+    return out
@@ -0,0 +1,91 @@
+# scripts/chart_renderer.py
+# Persistent chart for repeated renders (render farm workers, long-running processes).
+# email_report.draw_chart() builds the figure, axes, lines and fills from scratch for every chart.
+# ChartRenderer builds them once and, per chart, only:
+#   - moves the two lines to the new data with set_data()
+#   - replaces the two fill_between polygons
+#   - resets the x/y limits, re-running tight_layout only when they change (the tick labels,
+#     and so the margins, depend on them)
+# and writes the PNG to an in-memory buffer. Output matches draw_chart() for the same params.
+# Benchmark: python scripts/bench_chart.py
+
+import io, json, math
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from analytics import Advantage
+
+class ChartRenderer:
+    def __init__(self, params: dict):
+        from email_report import _pyplot
+        _pyplot()                                   # selects the Agg backend
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        self.params = p = params
+        self.fig = Figure(figsize=p["figsize"])
+        FigureCanvasAgg(self.fig)
+        self.fig.set_facecolor(p.get("bg_color", "white"))
+        self.ax = ax = self.fig.add_subplot()
+        if "bg_color" in p:
+            ax.set_facecolor(p["bg_color"])
+        if "text_color" in p:
+            ax.tick_params(colors=p["text_color"]); ax.yaxis.label.set_color(p["text_color"])
+        ax.axhline(0, color=p["zero_color"], linestyle=(0,(4,3)), linewidth=2)
+        ax.set_ylabel("% ahead"); ax.set_xlabel("")
+        ax.grid(True, axis="y", linestyle=":", color=p["grid_color"])
+        for sp in ("top","right","left","bottom"): ax.spines[sp].set_visible(False)
+        sp = self.fig.subplotpars
+        self.margins0 = dict(left=sp.left, right=sp.right, bottom=sp.bottom, top=sp.top)
+        self.lines, self.fills, self.layout_key = None, (), None
+
+    def update(self, adv: "Advantage"):
+        """Point the chart at new data (same series as draw_chart: zero crossings + downsampling)."""
+        import numpy as np
+        import numpy.ma as ma
+        from downsample import downsample
+        p, ax = self.params, self.ax
+        days, y = downsample(adv.days, adv.signed * 100.0, p.get("max_points", 0))
+        x = np.round(days * 86400).astype("datetime64[s]")
+        y_pos = ma.masked_less(y, 0.0)
+        y_neg = ma.masked_greater(y, 0.0)
+
+        for f in self.fills:
+            f.remove()
+        self.fills = (ax.fill_between(x, 0, y_pos, where=~ma.getmaskarray(y_pos), alpha=0.15, color=p["pos_color"]),
+                      ax.fill_between(x, 0, y_neg, where=~ma.getmaskarray(y_neg), alpha=0.15, color=p["neg_color"]))
+        if self.lines is None:
+            self.lines = (ax.plot(x, y_pos, color=p["pos_color"], linewidth=2)[0],
+                          ax.plot(x, y_neg, color=p["neg_color"], linewidth=2)[0])
+        else:
+            self.lines[0].set_data(x, y_pos)
+            self.lines[1].set_data(x, y_neg)
+            ax.dataLim.set_points(np.array([[np.inf, np.inf], [-np.inf, -np.inf]]))
+            ax.ignore_existing_data_limits = True
+            ax.update_datalim(np.column_stack([ax.xaxis.convert_units(x[[0, -1]]), [-1.0, 1.0]]))
+            ax.autoscale_view(scalex=True, scaley=False)
+
+        max_abs = max(5.0, math.ceil(float(np.abs(adv.signed).max()) * 100 * 1.1))
+        key = (x[0], x[-1], max_abs)
+        if key != self.layout_key:
+            ax.set_ylim(-max_abs, max_abs)
+            self.fig.subplots_adjust(**self.margins0)   # tight_layout from the same start as a new figure
+            self.fig.tight_layout()
+            self.layout_key = key
+
+    def png(self) -> bytes:
+        buf = io.BytesIO()
+        self.fig.savefig(buf, format="png", dpi=self.params["dpi"])
+        return buf.getvalue()
+
+    def render(self, adv: "Advantage") -> bytes:
+        self.update(adv)
+        return self.png()
+
+_renderers = {}
+
+def renderer_for(params: dict) -> ChartRenderer:
+    """One ChartRenderer per distinct params, kept for the life of the process."""
+    key = json.dumps(params, sort_keys=True)
+    if key not in _renderers:
+        _renderers[key] = ChartRenderer(params)
+    return _renderers[key]
@@ -0,0 +1,118 @@
+# scripts/columnar.py
+# Compact fixed-layout columnar history file (data/history.bin), little-endian:
+#
+#   offset 0   magic  b"MVWCOL1\0"                         8 bytes
+#          8   uint32 version (1), nrows, ncols, data_offset 16 bytes
+#         24   ncols × 32-byte NUL-padded ASCII column names
+#   data_offset            int32[nrows]   day number (days since 1970-01-01)
+#   (padded to 8 bytes)    float64[nrows] per column, in name order (NaN = missing)
+#   end                    sha256 footer over everything before it (durable.py, 74 bytes)
+#
+# Every array starts on an 8-byte boundary, so Python maps it with numpy.memmap
+# (zero copy). The file is a local build artifact (history_store.ensure_columnar), not committed.
+# Readers find every array by offset, so the footer is invisible to them. Both readers verify
+# it: read_rows on the bytes it loads, read_arrays in fixed-size chunks before mapping the file.
+# Writing needs only the stdlib; reading arrays needs numpy.
+
+import array, datetime as dt, struct, sys
+from pathlib import Path
+
+import durable
+
+MAGIC = b"MVWCOL1\0"
+VERSION = 1
+NAME_LEN = 32
+EPOCH = dt.date(1970, 1, 1)
+_HEADER = struct.Struct("<8sIIII")
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+def _le(arr):
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+def write(path: Path, rows, columns=None) -> int:
+    """Write rows (dicts with "date" + numeric columns) to `path`; returns bytes written."""
+    if columns is None:
+        columns = list(dict.fromkeys(k for r in rows for k in r if k.endswith("MarketCap")))
+    ncols, nrows = len(columns), len(rows)
+    data_offset = _HEADER.size + NAME_LEN * ncols
+    days = array.array("i", ((dt.date.fromisoformat(r["date"]) - EPOCH).days for r in rows))
+    parts = [_HEADER.pack(MAGIC, VERSION, nrows, ncols, data_offset)]
+    parts += [c.encode("ascii").ljust(NAME_LEN, b"\0")[:NAME_LEN] for c in columns]
+    parts.append(_le(days))
+    parts.append(b"\0" * (_pad8(4 * nrows) - 4 * nrows))
+    nan = float("nan")
+    for c in columns:
+        parts.append(_le(array.array("d", (nan if r.get(c) is None else float(r[c]) for r in rows))))
+    with durable.atomic_write(path, binary=True, footer=True) as f:
+        f.writelines(parts)
+        return f.tell()
+
+def write_arrays(path: Path, days, names, arrays) -> int:
+    """Write from numpy arrays without building row dicts (large or synthetic histories).
+       `arrays` yields one float array per name, in order, and may be a generator, so only
+       one column needs to be in memory at a time. Returns bytes written."""
+    import numpy as np
+    days = np.ascontiguousarray(days, dtype="<i4")
+    nrows, ncols = len(days), len(names)
+    data_offset = _HEADER.size + NAME_LEN * ncols
+    with durable.atomic_write(path, binary=True, footer=True) as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, nrows, ncols, data_offset))
+        f.writelines(c.encode("ascii").ljust(NAME_LEN, b"\0")[:NAME_LEN] for c in names)
+        f.write(days.tobytes())
+        f.write(b"\0" * (_pad8(4 * nrows) - 4 * nrows))
+        for a in arrays:
+            f.write(np.ascontiguousarray(a, dtype="<f8").tobytes())
+        return f.tell()
+
+def _header(buf: bytes):
+    magic, version, nrows, ncols, data_offset = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a columnar history file (bad magic/version)")
+    names = [buf[_HEADER.size + i*NAME_LEN:_HEADER.size + (i+1)*NAME_LEN].rstrip(b"\0").decode("ascii")
+             for i in range(ncols)]
+    return nrows, names, data_offset
+
+def read_arrays(path: Path, verify: bool = True):
+    """Zero-copy read: returns (days int32 memmap, {column: float64 memmap}).
+       verify checks the checksum footer first (ValueError on a mismatch); it reads the whole
+       file once, in chunks, so memory stays flat."""
+    import numpy as np
+    if verify:
+        durable.verify(path)
+    with open(path, "rb") as f:
+        head = f.read(_HEADER.size)
+        head += f.read(NAME_LEN * _HEADER.unpack_from(head, 0)[3])
+    nrows, names, off = _header(head)
+    days = np.memmap(path, dtype="<i4", mode="r", offset=off, shape=(nrows,)) if nrows else np.zeros(0, "<i4")
+    off += _pad8(4 * nrows)
+    cols = {}
+    for name in names:
+        cols[name] = np.memmap(path, dtype="<f8", mode="r", offset=off, shape=(nrows,)) if nrows else np.zeros(0, "<f8")
+        off += 8 * nrows
+    return days, cols
+
+def day_to_iso(day: int) -> str:
+    return (EPOCH + dt.timedelta(days=int(day))).isoformat()
+
+def read_rows(path: Path):
+    """Row dicts ({"date": ..., <column>: int}) using only the stdlib, e.g. for the JSON export."""
+    buf = durable.read_verified(path)
+    nrows, names, off = _header(buf)
+    def load(code, start):
+        a = array.array(code)
+        a.frombytes(buf[start:start + a.itemsize * nrows])
+        if sys.byteorder == "big":
+            a.byteswap()
+        return a
+    days = load("i", off)
+    off += _pad8(4 * nrows)
+    cols = []
+    for name in names:
+        cols.append((name, load("d", off)))
+        off += 8 * nrows
+    return [{"date": day_to_iso(days[i]),
+             **{n: (None if v[i] != v[i] else round(v[i])) for n, v in cols}} for i in range(nrows)]
@@ -0,0 +1,228 @@
+# scripts/daemon.py
+# Long-running scheduler for self-hosted deployments (python scripts/mvw.py daemon):
+# one warm process instead of a cold Python + import + pip install per job.
+#   - imports numpy/matplotlib once, keeps the quote provider (and its HTTP session) and quote
+#     cache, one persistent ChartRenderer per bet (email_report.WARM_RENDERERS) and one pooled
+#     Brevo session for every run
+#   - runs the daily fetch and the weekly report on internal schedules (UTC):
+#       MVW_DAEMON_FETCH  "01:30"      daily at 01:30, like daily.yml
+#       MVW_DAEMON_REPORT "wed 02:00"  weekly, like weekly-email.yml  ("" disables a job)
+#     A missed time is not caught up on start; trigger it with POST /run/<job> instead.
+#   - after a fetch, commits and pushes data/ like daily.yml, and the report commits changed charts
+#     like weekly-email.yml (MVW_DAEMON_GIT=0 or --dry-run: no git at all; --dry-run also runs the
+#     report with --dry-run)
+#   - quotes: market caps and prices always come from the provider; only shares outstanding are
+#     answered from the quote cache
+#   - serves http://MVW_DAEMON_HOST:MVW_DAEMON_PORT (default 127.0.0.1:8787):
+#       GET  /healthz    JSON: uptime, every job's schedule, next and last run; 503 if a job's
+#                        last run failed
+#       GET  /metrics    Prometheus text: job runs/failures/durations plus the spans and counters
+#                        of each job's last run (metrics.py)
+#       POST /run/<job>  queue fetch or report now
+# Jobs run one at a time on the main thread; SIGTERM/SIGINT stop after the current job.
+
+import datetime as dt
+import json, os, queue, signal, subprocess, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import metrics
+
+FETCH_AT = os.environ.get("MVW_DAEMON_FETCH", "01:30")
+REPORT_AT = os.environ.get("MVW_DAEMON_REPORT", "wed 02:00")
+HOST = os.environ.get("MVW_DAEMON_HOST", "127.0.0.1")
+PORT = int(os.environ.get("MVW_DAEMON_PORT", "8787"))
+GIT = os.environ.get("MVW_DAEMON_GIT", "1") != "0"
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+class Schedule:
+    """"HH:MM" (daily) or "<weekday> HH:MM" (weekly), UTC."""
+
+    def __init__(self, spec: str):
+        self.spec = spec.strip().lower()
+        parts = self.spec.split()
+        self.weekday = DAYS.index(parts[0][:3]) if len(parts) == 2 else None
+        hh, mm = parts[-1].split(":")
+        self.time = dt.time(int(hh), int(mm))
+
+    def next_after(self, now: dt.datetime) -> dt.datetime:
+        t = dt.datetime.combine(now.date(), self.time, tzinfo=dt.timezone.utc)
+        if self.weekday is not None:
+            t += dt.timedelta(days=(self.weekday - t.weekday()) % 7)
+        while t <= now:
+            t += dt.timedelta(days=1 if self.weekday is None else 7)
+        return t
+
+class Job:
+    def __init__(self, name: str, spec: str, fn):
+        self.name, self.fn = name, fn
+        self.schedule = Schedule(spec) if spec.strip() else None
+        self.next = self.last = self.last_ok = None   # next due (datetime), last run (dict), last success (epoch)
+        self.runs = {"ok": 0, "error": 0}
+        self.snapshot = None                        # metrics of the last run
+
+    def plan(self, now: dt.datetime):
+        self.next = self.schedule.next_after(now) if self.schedule else None
+
+class Daemon:
+    def __init__(self, dry_run: bool = False):
+        self.dry_run, self.git = dry_run, GIT and not dry_run
+        self.started = time.time()
+        self.queue, self.stopping = queue.Queue(), threading.Event()
+        self.jobs = {j.name: j for j in (Job("fetch", FETCH_AT, self.fetch), Job("report", REPORT_AT, self.report))}
+        self.provider = self.cache = self.client = None
+
+    # ---------- warm state ----------
+    def warm(self):
+        """Everything a cold job would import or build, done once."""
+        t0 = time.perf_counter()
+        import email_report
+        from bets import load_bets
+        from chart_renderer import renderer_for
+        from providers import provider_from_env
+        from quote_cache import CachedProvider, cache_from_env
+        email_report.WARM_RENDERERS = True
+        email_report._pyplot()
+        for bet in load_bets():
+            renderer_for(email_report.chart_params(bet))
+        self.provider, self.cache = provider_from_env(), cache_from_env()
+        if self.cache is not None:
+            self.provider = CachedProvider(self.provider, self.cache)   # prices live, shares cached
+        if not self.dry_run and email_report.BREVO_API_KEY:
+            from delivery import BrevoClient
+            self.client = BrevoClient(email_report.BREVO_API_KEY)
+        print(f"Warm in {time.perf_counter() - t0:.2f}s")
+
+    # ---------- jobs ----------
+    def _git(self, *args, check=True):
+        with metrics.span("git", op=args[0]):
+            return subprocess.run(["git", *args], check=check)
+
+    def fetch(self):
+        import fetch_caps
+        self.provider.reset()
+        if self.cache is not None:
+            self.cache.hits = self.cache.misses = 0
+        fetch_caps.main([], self.provider, self.cache)
+        if self.git:
+            import email_report
+            email_report.git_config()
+            self._git("add", "data")
+            if self._git("diff", "--cached", "--quiet", check=False).returncode != 0:
+                self._git("commit", "-m", f"chore(data): update market caps {dt.datetime.now(dt.timezone.utc):%Y-%m-%d}")
+                self._git("push")
+
+    def report(self):
+        import email_report
+        email_report.main(dry_run=self.dry_run, client=self.client, git=self.git)
+
+    def run(self, job: Job):
+        t0, started = time.perf_counter(), time.time()
+        if self.git:
+            self._git("pull", "--rebase", "--autostash", check=False)
+        try:
+            job.fn()
+            result, error = "ok", None
+        except (Exception, SystemExit) as e:        # fetch_caps exits on a total fetch failure
+            result, error = "error", f"{type(e).__name__}: {e}"
+            print(f"{job.name} failed: {error}")
+        job.snapshot = metrics.finish()
+        job.runs[result] += 1
+        job.last = {"started": started, "seconds": round(time.perf_counter() - t0, 3), "result": result, "error": error}
+        if result == "ok":
+            job.last_ok = started
+
+    # ---------- HTTP ----------
+    def health(self) -> dict:
+        iso = lambda t: t and dt.datetime.fromtimestamp(t, dt.timezone.utc).isoformat(timespec="seconds")
+        return {"ok": all(j.last is None or j.last["result"] == "ok" for j in self.jobs.values()),
+                "uptime_s": round(time.time() - self.started), "dry_run": self.dry_run,
+                "jobs": {j.name: {"schedule": j.schedule and j.schedule.spec, "next": j.next and j.next.isoformat(),
+                                  "last": j.last and {**j.last, "started": iso(j.last["started"])}, "runs": j.runs}
+                         for j in self.jobs.values()}}
+
+    def prometheus(self) -> str:
+        out = ["# TYPE mvw_daemon_uptime_seconds gauge", f"mvw_daemon_uptime_seconds {time.time() - self.started:.0f}",
+               "# TYPE mvw_job_runs_total counter"]
+        out += [f'mvw_job_runs_total{{job="{j.name}",result="{r}"}} {n}' for j in self.jobs.values() for r, n in j.runs.items()]
+        out.append("# TYPE mvw_job_last_run_seconds gauge")
+        out += [f'mvw_job_last_run_seconds{{job="{j.name}"}} {j.last["seconds"]}' for j in self.jobs.values() if j.last]
+        out.append("# TYPE mvw_job_last_success_timestamp_seconds gauge")
+        out += [f'mvw_job_last_success_timestamp_seconds{{job="{j.name}"}} {j.last_ok:.0f}'
+                for j in self.jobs.values() if j.last_ok]
+        out.append("# TYPE mvw_job_next_run_timestamp_seconds gauge")
+        out += [f'mvw_job_next_run_timestamp_seconds{{job="{j.name}"}} {j.next.timestamp():.0f}' for j in self.jobs.values() if j.next]
+        snaps = [j.snapshot for j in self.jobs.values() if j.snapshot]
+        return "\n".join(out) + "\n" + (metrics.prometheus(*snaps) if snaps else "")
+
+    def serve(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, body: str, ctype="application/json"):
+                data = body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/healthz":
+                    h = daemon.health()
+                    self._send(200 if h["ok"] else 503, json.dumps(h, indent=1) + "\n")
+                elif self.path == "/metrics":
+                    self._send(200, daemon.prometheus(), "text/plain; version=0.0.4")
+                else:
+                    self._send(404, '{"error": "not found"}\n')
+
+            def do_POST(self):
+                name = self.path.removeprefix("/run/")
+                if self.path.startswith("/run/") and name in daemon.jobs:
+                    daemon.queue.put(name)
+                    self._send(202, json.dumps({"queued": name}) + "\n")
+                else:
+                    self._send(404, '{"error": "not found"}\n')
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((HOST, PORT), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"Serving http://{HOST}:{self.server.server_port}/healthz and /metrics")
+
+    # ---------- loop ----------
+    def stop(self, *_):
+        self.stopping.set()
+        self.queue.put(None)
+
+    def loop(self):
+        now = dt.datetime.now(dt.timezone.utc)
+        for j in self.jobs.values():
+            j.plan(now)
+            print(f"{j.name}: {j.schedule.spec + ', next ' + j.next.isoformat() if j.schedule else 'not scheduled'}")
+        while not self.stopping.is_set():
+            due = [j for j in self.jobs.values() if j.next]
+            wait = min((j.next - dt.datetime.now(dt.timezone.utc)).total_seconds() for j in due) if due else None
+            try:
+                name = self.queue.get(timeout=max(0.0, wait) if wait is not None else None)
+            except queue.Empty:
+                name = min(due, key=lambda j: j.next).name
+                self.jobs[name].plan(dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=1))
+            if name is None:
+                break
+            print(f"Running {name}")
+            self.run(self.jobs[name])
+
+def main(dry_run: bool = False):
+    d = Daemon(dry_run)
+    d.warm()
+    d.serve()
+    signal.signal(signal.SIGTERM, d.stop)
+    signal.signal(signal.SIGINT, d.stop)
+    try:
+        d.loop()
+    finally:
+        d.server.shutdown()
+        if d.client is not None:
+            d.client.close()
+        print("Stopped")
@@ -0,0 +1,116 @@
+# scripts/delivery.py
+# Batched email delivery through Brevo's transactional API.
+#   - one pooled requests.Session (keep-alive) for every request in the run
+#   - recipients are split into batches of BREVO_BATCH_SIZE; each batch is one API call whose
+#     "messageVersions" give every recipient their own message (no shared To: line)
+#   - batches are sent concurrently (BREVO_CONCURRENCY) under a requests/second limit (BREVO_RATE)
+#   - only failed batches are retried (429 / 5xx / connection errors), with exponential backoff
+# BREVO_API_URL points the client at a local stand-in (see fake_brevo.py) for offline runs.
+
+import os, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import metrics
+
+API_URL     = os.environ.get("BREVO_API_URL", "https://api.brevo.com/v3/smtp/email")
+BATCH_SIZE  = int(os.environ.get("BREVO_BATCH_SIZE", "50"))
+CONCURRENCY = int(os.environ.get("BREVO_CONCURRENCY", "4"))
+RATE        = float(os.environ.get("BREVO_RATE", "5"))        # requests per second
+MAX_TRIES   = int(os.environ.get("BREVO_MAX_TRIES", "3"))
+
+RETRYABLE = {429, 500, 502, 503, 504}
+
+def chunks(items, size):
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart, across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class BrevoClient:
+    def __init__(self, api_key: str, url: str = API_URL, batch_size: int = BATCH_SIZE,
+                 concurrency: int = CONCURRENCY, rate: float = RATE, max_tries: int = MAX_TRIES):
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.url, self.batch_size, self.concurrency, self.max_tries = url, batch_size, concurrency, max_tries
+        self.limiter = RateLimiter(rate)
+        self.session = requests.Session()
+        self.session.headers.update({"accept": "application/json", "content-type": "application/json",
+                                     "api-key": api_key})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, concurrency))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.requests_sent = self.retries = 0
+
+    def _post(self, payload):
+        """One attempt; returns (ok, retryable, detail)."""
+        import requests
+        self.limiter.wait()
+        try:
+            with metrics.span("http_send"):
+                r = self.session.post(self.url, json=payload, timeout=45)
+        except requests.RequestException as e:
+            metrics.incr("http_requests", status="error")
+            return False, True, repr(e)
+        metrics.incr("http_requests", status=r.status_code)
+        if r.status_code in (200, 201, 202):
+            return True, False, r.text[:300]
+        return False, r.status_code in RETRYABLE, f"{r.status_code} {r.text[:300]}"
+
+    def send(self, message: dict, recipients, on_result=None):
+        """Send `message` (sender/subject/htmlContent...) to every recipient ({"email": ...})
+           as one message each. Returns {"sent": [...emails], "failed": {email: error}}.
+           on_result(batch, ok, detail) is called as soon as a batch is accepted, and once
+           per batch that is still failing after the last attempt."""
+        batches = chunks(list(recipients), self.batch_size)
+        payloads = [{**message, "messageVersions": [{"to": [r]} for r in batch]} for batch in batches]
+        pending = list(range(len(batches)))
+        errors = {}
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as pool:
+            for attempt in range(1, self.max_tries + 1):
+                if attempt > 1:
+                    self.retries += len(pending)
+                    metrics.incr("retries", len(pending), stage="send")
+                    time.sleep(min(30.0, 2.0 ** (attempt - 1)))
+                self.requests_sent += len(pending)
+                futures = {pool.submit(self._post, payloads[i]): i for i in pending}
+                retry = []
+                for fut in as_completed(futures):       # record each batch as soon as it answers
+                    i, (ok, retryable, detail) = futures[fut], fut.result()
+                    if ok:
+                        errors.pop(i, None)
+                        print(f"Brevo accepted batch {i + 1}/{len(batches)} ({len(batches[i])} recipients)")
+                        if on_result: on_result(batches[i], True, detail)
+                    else:
+                        errors[i] = detail
+                        print(f"Brevo error on batch {i + 1}/{len(batches)} (attempt {attempt}): {detail}",
+                              file=sys.stderr)
+                        if retryable:
+                            retry.append(i)
+                pending = sorted(retry)
+                if not pending:
+                    break
+        if on_result:
+            for i in sorted(errors):
+                on_result(batches[i], False, errors[i])
+        sent = [r["email"] for i, b in enumerate(batches) if i not in errors for r in b]
+        failed = {r["email"]: errors[i] for i in errors for r in batches[i]}
+        metrics.incr("recipients", len(sent), outcome="sent")
+        metrics.incr("recipients", len(failed), outcome="failed")
+        return {"sent": sent, "failed": failed}
+
+    def close(self):
+        self.session.close()
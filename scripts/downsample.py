@@ -0,0 +1,50 @@
+# scripts/downsample.py
+# Chart-series downsampling: Largest-Triangle-Three-Buckets (LTTB), split at zero crossings.
+# A chart never needs more points than it has horizontal pixels. downsample() first inserts the
+# exact y=0 crossings (analytics.with_crossings), then cuts the series at every zero point and
+# runs LTTB on each same-sign piece with a share of the budget proportional to its length.
+# Every crossing and both ends are kept exactly, and no new crossing can appear.
+
+import numpy as np
+
+from analytics import with_crossings
+
+def lttb(x, y, n: int):
+    """Indices of the n points of (x, y) picked by LTTB; the first and last points are always kept."""
+    x = np.asarray(x, dtype=float); y = np.asarray(y, dtype=float)
+    size = len(x)
+    if n >= size:
+        return np.arange(size)
+    if n <= 2:
+        return np.array([0, size - 1][:max(n, 1)])
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)    # n-2 buckets over the interior
+    keep = np.empty(n, dtype=np.int64)
+    keep[0], keep[-1] = 0, size - 1
+    a = 0
+    for k in range(n - 2):
+        lo, hi = edges[k], edges[k + 1]
+        if k == n - 3:
+            cx, cy = x[-1], y[-1]                                 # next "bucket" is the last point
+        else:
+            cx, cy = x[hi:edges[k + 2]].mean(), y[hi:edges[k + 2]].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        keep[k + 1] = a
+    return keep
+
+def downsample(x, y, n: int):
+    """with_crossings(x, y) reduced to about n points (n <= 0: no limit). Zero points and both ends
+       are always kept, so the result can exceed n only when there are more crossings than n."""
+    x, y = with_crossings(x, y)
+    if n <= 0 or len(x) <= n:
+        return x, y
+    bounds = np.unique(np.concatenate([[0], np.flatnonzero(y == 0), [len(x) - 1]]))
+    interior = len(x) - len(bounds)
+    spare = max(0, n - len(bounds))
+    keep = []
+    for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        share = 2 + (round(spare * (hi - lo - 1) / interior) if interior else 0)
+        keep.append(lo + lttb(x[lo:hi + 1], y[lo:hi + 1], share)[:-1])
+    keep.append([len(x) - 1])
+    keep = np.concatenate(keep)
+    return x[keep], y[keep]
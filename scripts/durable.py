@@ -0,0 +1,123 @@
+# scripts/durable.py
+# Crash-safe file writes: stream to a temp file in the same directory, fsync it, rename it over
+# the target (atomic on POSIX), then fsync the directory so the rename itself survives a crash.
+# Readers see either the old file or the new one, never a truncated one.
+#   with atomic_write(path) as f: json.dump(rows, f)       # text (utf-8); binary=True for bytes
+#   write_bytes(path, data) / write_text(path, text)
+# footer=True appends a checksum footer after the content:
+#   b"\n#sha256:" + 64 hex digits + b"\n"                    (74 bytes, fixed length)
+# The hash is computed on the buffered chunks as they are written, so a large file is written
+# once and never re-read to checksum it. read_verified() strips and checks the footer;
+# verify() checks a file in fixed-size chunks without loading it (e.g. a memory-mapped file).
+
+import hashlib, io, os
+from contextlib import contextmanager
+from pathlib import Path
+
+TAG = b"\n#sha256:"
+FOOTER_LEN = len(TAG) + 64 + 1
+BUFFER = 1 << 20
+
+class _HashingRaw(io.RawIOBase):
+    """Raw writer on a file descriptor that hashes exactly the bytes it writes."""
+
+    def __init__(self, fd: int):
+        self.fd, self.sha = fd, hashlib.sha256()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        n = os.write(self.fd, b)
+        self.sha.update(memoryview(b)[:n])
+        return n
+
+    def tell(self):
+        return os.lseek(self.fd, 0, os.SEEK_CUR)
+
+    def close(self):
+        if not self.closed:
+            os.close(self.fd)
+        super().close()
+
+def _fsync_dir(path: Path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:                                 # e.g. directories can't be opened on Windows
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+@contextmanager
+def atomic_write(path, binary: bool = False, footer: bool = False):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    raw = _HashingRaw(fd)
+    buf = io.BufferedWriter(raw, BUFFER)
+    f = buf if binary else io.TextIOWrapper(buf, encoding="utf-8", newline="")
+    try:
+        yield f
+        f.flush()
+        if footer:
+            os.write(fd, TAG + raw.sha.hexdigest().encode("ascii") + b"\n")
+        os.fsync(fd)
+        f.close()
+    except BaseException:
+        raw.close()                                 # drops anything still buffered
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+def write_bytes(path, data: bytes, footer: bool = False) -> int:
+    with atomic_write(path, binary=True, footer=footer) as f:
+        f.write(data)
+    return len(data)
+
+def write_text(path, text: str, footer: bool = False) -> int:
+    return write_bytes(path, text.encode("utf-8"), footer)
+
+def split_footer(data: bytes):
+    """(content, hex digest or None) for bytes that may end with a checksum footer."""
+    tail = data[-FOOTER_LEN:]
+    if len(tail) == FOOTER_LEN and tail.startswith(TAG) and tail.endswith(b"\n"):
+        return data[:-FOOTER_LEN], tail[len(TAG):-1].decode("ascii")
+    return data, None
+
+def read_verified(path, required: bool = False) -> bytes:
+    """File content without its footer. Raises ValueError if the footer's hash does not match
+       (or, with required, if there is no footer)."""
+    data, digest = split_footer(Path(path).read_bytes())
+    if digest is None:
+        if required:
+            raise ValueError(f"{Path(path).name} has no checksum footer")
+        return data
+    if hashlib.sha256(data).hexdigest() != digest:
+        raise ValueError(f"{Path(path).name} does not match its checksum footer (torn or edited write)")
+    return data
+
+def verify(path) -> bool:
+    """True if the footer matches, False if there is none; raises ValueError on a mismatch.
+       Reads the file in chunks, so it works on files larger than memory."""
+    path = Path(path)
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        if size < FOOTER_LEN:
+            return False
+        f.seek(size - FOOTER_LEN)
+        _, digest = split_footer(f.read())
+        if digest is None:
+            return False
+        f.seek(0)
+        sha, left = hashlib.sha256(), size - FOOTER_LEN
+        while left:
+            chunk = f.read(min(BUFFER, left))
+            sha.update(chunk)
+            left -= len(chunk)
+    if sha.hexdigest() != digest:
+        raise ValueError(f"{path.name} does not match its checksum footer (torn or edited write)")
+    return True
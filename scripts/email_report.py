@@ -1,26 +1,40 @@
 # scripts/email_report.py
-# Sends the Wednesday email (with inline chart), no attachments.
-# Also regenerates/commits images/weekly-chart.png so GitHub Pages (or raw.githubusercontent) can serve it.
+# Sends the Wednesday email (with inline chart), no attachments, for every bet in data/bets.json.
+# Also regenerates/commits each bet's chart (images/weekly-chart.png for the original bet)
+# so GitHub Pages (or raw.githubusercontent) can serve it. Charts render in a process pool.
 
 import datetime as dt
-import json, math, os, sys, subprocess
+import hashlib, json, math, os, subprocess, time
 from pathlib import Path
-import requests
+from typing import TYPE_CHECKING
 
-# Optional chart libs
-try:
-    import numpy as np
-    import matplotlib
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
-except Exception:
-    plt = None
-    np = None
+import durable, history_store, metrics
+from bets import load_bets
+
+if TYPE_CHECKING:
+    from analytics import Advantage
+
+# numpy (via analytics), matplotlib and requests are imported inside the functions that
+# use them, so importing this module (mvw status, dry runs) stays stdlib-only and fast.
 
 ROOT = Path(__file__).resolve().parents[1]
 HISTORY_PATH = ROOT / "data" / "history.json"
+HISTORY_BIN_PATH = ROOT / "data" / "history.bin"
 CHART_PATH = ROOT / "images" / "weekly-chart.png"
 
+# Everything that affects the rendered pixels (plus each bet's colors); part of the render-cache key
+CHART_PARAMS = {"figsize": (11, 4), "dpi": 160, "zero_color": "#cbd5e1", "grid_color": "#e5e7eb", "version": 2}
+# Most points a chart plots (LTTB, see downsample.py); default one per horizontal pixel, 0 = all
+CHART_PARAMS["max_points"] = int(os.environ.get("MVW_CHART_POINTS", CHART_PARAMS["figsize"][0] * CHART_PARAMS["dpi"]))
+# Output stage (chart_output.py): PNG palette size (0 = full color) and an SVG copy for the site
+CHART_PARAMS["png_colors"] = int(os.environ.get("MVW_PNG_COLORS", "32"))
+CHART_PARAMS["svg"] = os.environ.get("MVW_CHART_SVG", "1") != "0"
+RENDER_WORKERS = int(os.environ.get("MVW_RENDER_WORKERS", "0")) or None   # None = one per CPU
+REPORT_WINDOW = os.environ.get("MVW_REPORT_WINDOW", "").strip().lower()     # "" = whole history, "90d", "365d", "ytd"
+# Long-running processes (mvw daemon) set this: charts render in-process on one persistent
+# ChartRenderer per params (chart_renderer.renderer_for) instead of a new figure or process pool.
+WARM_RENDERERS = False
+
 # --- ENV ---
 BREVO_API_KEY   = os.environ.get("BREVO_API_KEY", "")
 FROM_EMAIL      = os.environ.get("REPORT_FROM_EMAIL", "")
@@ -42,26 +56,76 @@ def pct_str(x: float) -> str:
     return f"{x*100:.2f}%"
 
 def clean_rows(history):
-    rows = [r for r in history if r and r.get("date") and r.get("bpMarketCap") is not None and r.get("coinMarketCap") is not None]
+    rows = [r for r in history if r and r.get("date")]
     rows.sort(key=lambda r: r["date"])
     return rows
 
-def signed_pct(row) -> float:
-    """Signed advantage (%):
-       + = Marty (COIN vs BP denom=BP)
-       − = Winslow (BP vs COIN denom=COIN)
-    """
-    bp = float(row["bpMarketCap"]); coin = float(row["coinMarketCap"])
-    diff = coin - bp
-    if diff == 0 or bp == 0 or coin == 0: return 0.0
-    denom = bp if diff >= 0 else coin
-    return diff / denom
-
-def leader_and_ahead(row):
-    bp = float(row["bpMarketCap"]); coin = float(row["coinMarketCap"])
-    if coin > bp: return "Marty (COIN)", (coin - bp)/bp
-    if bp > coin: return "Winslow (BP)", (bp - coin)/coin
-    return "Tied", 0.0
+def _columns_from_rows(rows):
+    import numpy as np
+    names = list(dict.fromkeys(k for r in rows for k in r if k.endswith("MarketCap")))
+    days = np.array([r["date"] for r in rows], dtype="datetime64[D]").astype(np.int64)
+    nan = float("nan")
+    return days, {n: np.array([nan if r.get(n) is None else float(r[n]) for r in rows]) for n in names}
+
+def load_columns(start: str = None):
+    """(days, {column: float array}) for every stored cap column, date-sorted; NaN = missing.
+       Prefers the memory-mapped columnar file (data/history.bin, built from the log if missing or
+       stale); falls back to data/history.json.
+       With `start`, opens only the monthly shards from that date on, plus the first shard."""
+    import numpy as np
+    if start and history_store.MANIFEST_PATH.exists():
+        return _columns_from_rows(clean_rows(history_store.read_range(start, include_first=True, calendar=True)))
+    if HISTORY_BIN_PATH == history_store.BIN_PATH:
+        history_store.ensure_columnar()             # not committed: built from the log when stale
+    if HISTORY_BIN_PATH.exists():
+        import columnar
+        days, cols = columnar.read_arrays(HISTORY_BIN_PATH)
+        if np.all(days[1:] >= days[:-1]):
+            return days, cols                           # already sorted (repeated days too): stay zero-copy
+        order = np.argsort(days, kind="stable")
+        return days[order], {k: v[order] for k, v in cols.items()}
+    with metrics.span("json_load"):
+        rows = history_store.read_json_export(HISTORY_PATH)
+    with metrics.span("clean"):
+        return _columns_from_rows(clean_rows(rows))
+
+def window_start_date(window: str, latest: dt.date) -> dt.date:
+    """First day shown by a report window: "ytd" → Jan 1, "90d" → 90 days before `latest`."""
+    if window == "ytd":
+        return dt.date(latest.year, 1, 1)
+    return latest - dt.timedelta(days=int(window.rstrip("d")))
+
+def report_columns(window: str = REPORT_WINDOW):
+    """Columns for the weekly report. Whole history: load_columns(). With a window, only the shards
+       covering the chart window and the 7d/30d/90d/YTD baselines (14 days of slack for gaps)."""
+    last = history_store.last_date()
+    if not window or not last:
+        return load_columns()
+    latest = dt.date.fromisoformat(last)
+    start = min(window_start_date(window, latest), dt.date(latest.year - 1, 12, 31),
+                latest - dt.timedelta(days=90)) - dt.timedelta(days=14)
+    return load_columns(start.isoformat())
+
+def chart_view(adv: "Advantage", window: str = REPORT_WINDOW) -> "Advantage":
+    """The part of `adv` the chart shows: everything, or the rows inside the report window."""
+    if not window or not len(adv):
+        return adv
+    return adv.since(window_start_date(window, dt.date.fromisoformat(adv.iso_dates(-1))))
+
+def load_advantage(bet=None, columns=None):
+    """Analytics for one bet (default: the first in data/bets.json) over rows where both sides are known."""
+    import numpy as np
+    from analytics import Advantage
+    bet = bet or load_bets()[0]
+    days, cols = columns or load_columns()
+    if bet.a.column not in cols or bet.b.column not in cols:
+        return Advantage([], [], [])
+    a, b = cols[bet.a.column], cols[bet.b.column]
+    keep = np.flatnonzero(~(np.isnan(a) | np.isnan(b)))
+    return Advantage(days[keep], a[keep], b[keep])
+
+def leader_names(bet):
+    return {1: bet.a.label, -1: bet.b.label, 0: "Tied"}   # keyed by analytics.A / B / TIE
 
 def parse_recipients(raw: str):
     parts = [p.strip() for p in raw.replace("\n", ",").replace(" ", ",").split(",") if p.strip()]
@@ -74,49 +138,111 @@ def parse_recipients(raw: str):
     return out
 
 # ---------- Chart ----------
-def make_chart_png(rows, save_path: Path):
-    if plt is None or np is None:
-        raise RuntimeError("matplotlib/numpy not available in environment")
-
-    xs = [dt.date.fromisoformat(r["date"]) for r in rows]
-    ys = [signed_pct(r) * 100.0 for r in rows]
-    max_abs = max(5.0, math.ceil(max(abs(v) for v in ys) * 1.1))
-
+def _pyplot():
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except Exception:
+        raise RuntimeError("matplotlib not available in environment")
+    return plt
+
+def chart_params(bet) -> dict:
+    return {**CHART_PARAMS, "pos_color": bet.a.color, "neg_color": bet.b.color}
+
+def draw_chart(fig, adv: "Advantage", params: dict):
+    """Draw a bet's chart into `fig` (cleared first, so render workers can reuse one figure)."""
+    import numpy as np
     import numpy.ma as ma
-    y = np.array(ys, dtype=float)
-    x = np.array(xs)
-
-    y_pos = ma.masked_less(y, 0.0)     # Marty (blue)
-    y_neg = ma.masked_greater(y, 0.0)  # Winslow (green)
-
-    fig, ax = plt.subplots(figsize=(11,4))
-    ax.axhline(0, color="#cbd5e1", linestyle=(0,(4,3)), linewidth=2)
-    ax.fill_between(x, 0, y_pos, where=~y_pos.mask, alpha=0.15, color="#184FF8")
-    ax.fill_between(x, 0, y_neg, where=~y_neg.mask, alpha=0.15, color="#007F01")
-    ax.plot(x, y_pos, color="#184FF8", linewidth=2)
-    ax.plot(x, y_neg, color="#007F01", linewidth=2)
+    from downsample import downsample
+
+    # Exact zero-crossing points so the blue and green lines meet at 0 (as on the site),
+    # downsampled to at most one point per pixel; the axis bound uses every point
+    days, y = downsample(adv.days, adv.signed * 100.0, params.get("max_points", 0))
+    x = np.round(days * 86400).astype("datetime64[s]")
+    max_abs = max(5.0, math.ceil(float(np.abs(adv.signed).max()) * 100 * 1.1))
+
+    y_pos = ma.masked_less(y, 0.0)     # side A, e.g. Marty (blue)
+    y_neg = ma.masked_greater(y, 0.0)  # side B, e.g. Winslow (green)
+
+    p = params
+    fig.clf()
+    ax = fig.add_subplot()
+    fig.set_facecolor(p.get("bg_color", "white"))    # themes: see render_farm.py
+    if "bg_color" in p:
+        ax.set_facecolor(p["bg_color"])
+    if "text_color" in p:
+        ax.tick_params(colors=p["text_color"]); ax.yaxis.label.set_color(p["text_color"])
+    ax.axhline(0, color=p["zero_color"], linestyle=(0,(4,3)), linewidth=2)
+    ax.fill_between(x, 0, y_pos, where=~ma.getmaskarray(y_pos), alpha=0.15, color=p["pos_color"])
+    ax.fill_between(x, 0, y_neg, where=~ma.getmaskarray(y_neg), alpha=0.15, color=p["neg_color"])
+    ax.plot(x, y_pos, color=p["pos_color"], linewidth=2)
+    ax.plot(x, y_neg, color=p["neg_color"], linewidth=2)
 
     ax.set_ylim(-max_abs, max_abs)
     ax.set_ylabel("% ahead"); ax.set_xlabel("")
-    ax.grid(True, axis="y", linestyle=":", color="#e5e7eb")
+    ax.grid(True, axis="y", linestyle=":", color=p["grid_color"])
     for sp in ("top","right","left","bottom"): ax.spines[sp].set_visible(False)
     fig.tight_layout()
 
-    save_path.parent.mkdir(parents=True, exist_ok=True)
-    fig.savefig(save_path, dpi=160)
+def make_chart_png(adv: "Advantage", save_path: Path, params: dict) -> dict:
+    """Render to save_path (+ .svg if params["svg"]); returns the output sizes (chart_output.save_chart)."""
+    from chart_output import save_chart
+    if WARM_RENDERERS:
+        from chart_renderer import renderer_for
+        r = renderer_for(params)
+        r.update(adv)
+        return save_chart(r.fig, save_path, params)
+    plt = _pyplot()
+    fig = plt.figure(figsize=params["figsize"])
+    draw_chart(fig, adv, params)
+    sizes = save_chart(fig, save_path, params)
     plt.close(fig)
+    return sizes
+
+# ---------- Render cache ----------
+# <chart>.png.hash (e.g. images/weekly-chart.png.hash) records {"hash", "render_s"} of the last
+# render and is committed with the PNG. The hash covers the cleaned data arrays and the chart
+# params, so identical inputs mean an identical PNG: the render and every git subprocess can be skipped.
+def chart_hash_path(chart_path: Path) -> Path:
+    return chart_path.with_name(chart_path.name + ".hash")
+
+def chart_input_hash(adv: "Advantage", params: dict) -> str:
+    import numpy as np
+    h = hashlib.sha256()
+    for arr in (adv.days, adv.a, adv.b):
+        h.update(np.ascontiguousarray(arr).tobytes())
+    h.update(json.dumps(params, sort_keys=True).encode())
+    return h.hexdigest()
+
+def read_chart_cache(chart_path: Path) -> dict:
+    try:
+        return json.loads(chart_hash_path(chart_path).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def write_chart_cache(chart_path: Path, digest: str, render_s: float, sizes: dict = None):
+    rec = {"hash": digest, "render_s": round(render_s, 3)}
+    if sizes:
+        rec["bytes"] = sizes
+    durable.write_text(chart_hash_path(chart_path), json.dumps(rec) + "\n")
 
 def git_config():
     subprocess.run(["git","config","user.name","mvw-bot"], check=True)
     subprocess.run(["git","config","user.email","actions@users.noreply.github.com"], check=True)
 
-def commit_chart_if_changed():
+def _git(*args, check=True):
+    with metrics.span("git", op=args[0]):
+        return subprocess.run(["git", *args], check=check)
+
+def commit_chart_if_changed(chart_paths=(CHART_PATH,)):
     git_config()
-    subprocess.run(["git","add", str(CHART_PATH)], check=True)
-    diff = subprocess.run(["git","diff","--cached","--quiet"])
+    files = [str(f) for p in chart_paths for f in (p, chart_hash_path(p), p.with_suffix(".svg")) if f.exists()]
+    _git("add", *files)
+    diff = _git("diff", "--cached", "--quiet", check=False)
     if diff.returncode != 0:
-        subprocess.run(["git","commit","-m", f"chore(email): update weekly chart {dt.date.today().isoformat()}"], check=True)
-        subprocess.run(["git","push"], check=True)
+        _git("commit", "-m", f"chore(email): update weekly chart {dt.date.today().isoformat()}")
+        _git("push")
 
 def compute_pages_url() -> str:
     """If SITE_URL not set, derive GitHub Pages URL:
@@ -134,135 +260,193 @@ def compute_pages_url() -> str:
     return ""
 
 # ---------- HTML ----------
-def html_report(rows, image_url: str) -> str:
-    latest = rows[-1]
-    leader, ahead = leader_and_ahead(latest)
-
-    # Δ vs 7d (calendar-based: latest vs most recent row <= latest_date - 7 days)
-    latest_date = dt.date.fromisoformat(latest["date"])
-    threshold = latest_date - dt.timedelta(days=7)
-    idx_old = 0
-    for i, r in enumerate(rows):
-        d = dt.date.fromisoformat(r["date"])
-        if d <= threshold:
-            idx_old = i
-    delta7 = signed_pct(latest) - signed_pct(rows[idx_old])
-
-    blue, green = "#184FF8", "#007F01"
-    leader_color = blue if leader.startswith("Marty") else green
-
-    tail = rows[-7:] if len(rows) >= 7 else rows[:]
-    tr_html = []
-    for r in reversed(tail):
-        nm, pct = leader_and_ahead(r)
-        pill = blue if nm.startswith("Marty") else green
-        tr_html.append(
-            f"<tr>"
-            f"<td style='padding:8px;border-bottom:1px solid #e5e7eb'>{r['date']}</td>"
-            f"<td style='padding:8px;border-bottom:1px solid #e5e7eb'>{money_str(r['bpMarketCap'])}</td>"
-            f"<td style='padding:8px;border-bottom:1px solid #e5e7eb'>{money_str(r['coinMarketCap'])}</td>"
-            f"<td style='padding:8px;border-bottom:1px solid #e5e7eb'>{nm}</td>"
-            f"<td style='padding:8px;border-bottom:1px solid #e5e7eb'>"
-            f"<span style='border:1px solid {pill};border-radius:999px;padding:3px 8px;color:{pill};font-size:12px'>{pct_str(pct)}</span>"
-            f"</td></tr>"
-        )
+# Layout: email_template.py (compiled once); these functions only compute the slot values.
+def report_values(adv: "Advantage", image_url: str, bet=None) -> dict:
+    """Every bet-level slot of email_template.REPORT."""
+    from email_template import ROW
+    bet = bet or load_bets()[0]
+    names = leader_names(bet)
+    latest = len(adv) - 1
+    code = int(adv.leader[latest])
+    leader, ahead = names[code], float(adv.ahead[latest])
+
+    # Δ vs 7d (calendar-based: latest vs most recent row <= latest_date - 7 days); O(log n) each
+    deltas_html = " • ".join(f"{label}: {pct_str(adv.delta(w))}" for label, w in
+                             (("30d", "30d"), ("90d", "90d"), ("YTD", "ytd"), ("Since start", "inception")))
+
+    a_color, b_color = bet.a.color, bet.b.color
+    tail = slice(max(0, len(adv) - 7), None)
+    rows = "".join(ROW.fill(d, money_str(b_cap), money_str(a_cap), names[c], a_color if c == 1 else b_color, pct_str(pct))
+                   for d, b_cap, a_cap, c, pct in reversed(list(zip(
+                       adv.iso_dates(tail), adv.b[tail].tolist(), adv.a[tail].tolist(),
+                       adv.leader[tail].tolist(), adv.ahead[tail].tolist()))))
 
     pages = compute_pages_url()
     link_html = (f"<p style='margin:8px 0 0'><a href='{pages}' "
                  f"style='color:#2563eb;text-decoration:none'>Open the live dashboard →</a></p>") if pages else ""
-
-    img_tag = f"<img src='{pages}/images/{CHART_PATH.name}' alt='Marty vs Winslow chart' style='width:100%;max-width:1000px;border-radius:12px;display:block;margin:8px 0'/>" if pages else ""
-
-    return f"""<!doctype html>
-<html><body style="font-family:-apple-system,Segoe UI,Roboto,Helvetica,Arial,sans-serif;color:#0b1221;background:#ffffff;margin:0;padding:16px;">
-  <div style="max-width:720px;margin:0 auto;">
-    <h2 style="margin:0 0 4px 0;">Marty vs Winslow — Weekly Update</h2>
-    <div style="color:#6b7280;margin-bottom:12px;">COIN vs BP market capitalization • Ends May 1, 2030</div>
-
-    <div style="background:#f8fafc;border-radius:12px;padding:14px 16px;margin-bottom:12px;">
-      <table role="presentation" style="width:100%;border-collapse:collapse">
-        <tr>
-          <td style="padding:6px 0;width:33%;">
-            <div style="color:#6b7280;font-size:13px;">Days left</div>
-            <div style="font-weight:700;font-size:22px;">{days_left()}</div>
-          </td>
-          <td style="padding:6px 0;width:33%;">
-            <div style="color:#6b7280;font-size:13px;">Currently winning</div>
-            <div style="font-weight:800;font-size:22px;color:{leader_color}">{leader}</div>
-          </td>
-          <td style="padding:6px 0;width:33%;">
-            <div style="color:#6b7280;font-size:13px;">% ahead</div>
-            <div style="font-weight:700;font-size:22px;">{pct_str(ahead)} <span style="color:#6b7280;font-size:12px">(Δ vs 7d: {pct_str(delta7)})</span></div>
-          </td>
-        </tr>
-      </table>
-      <div style="color:#6b7280;font-size:12px;margin-top:4px">% ahead = (leader − loser) / loser</div>
-    </div>
-
-    {img_tag}
-
-    <div style="background:#f8fafc;border-radius:12px;padding:14px 16px;margin-top:12px;">
-      <div style="display:flex;justify-content:space-between;align-items:baseline;margin-bottom:8px;">
-        <strong>Last 7 entries</strong>
-        <span style="color:#6b7280;font-size:12px;">Updated {rows[-1]['date']}</span>
-      </div>
-      <table style="width:100%;border-collapse:collapse;">
-        <thead>
-          <tr>
-            <th align="left" style="padding:8px;border-bottom:1px solid #e5e7eb;">Date</th>
-            <th align="left" style="padding:8px;border-bottom:1px solid #e5e7eb;">BP Market Cap</th>
-            <th align="left" style="padding:8px;border-bottom:1px solid #e5e7eb;">COIN Market Cap</th>
-            <th align="left" style="padding:8px;border-bottom:1px solid #e5e7eb;">Leader</th>
-            <th align="left" style="padding:8px;border-bottom:1px solid #e5e7eb;">% Ahead</th>
-          </tr>
-        </thead>
-        <tbody>
-          {''.join(tr_html)}
-        </tbody>
-      </table>
-      {link_html}
-    </div>
-
-    <div style="color:#6b7280;font-size:12px;margin-top:12px;">This email was sent automatically by GitHub Actions using Brevo.</div>
-  </div>
-</body></html>"""
-
-def send_email_with_brevo(html):
+    img_tag = f"<img src='{image_url}' alt='{bet.title} chart' style='width:100%;max-width:1000px;border-radius:12px;display:block;margin:8px 0'/>" if image_url else ""
+
+    return {"title": bet.title, "a_ticker": bet.a.ticker, "b_ticker": bet.b.ticker, "end_str": bet.end_str,
+            "days_left": days_left(bet.end_date), "leader_color": a_color if code == 1 else b_color,
+            "leader": leader, "ahead": pct_str(ahead), "delta7": pct_str(adv.delta("7d")), "deltas": deltas_html,
+            "img_tag": img_tag, "latest_date": adv.iso_dates(latest), "rows": rows, "link_html": link_html}
+
+def report_template(adv: "Advantage", image_url: str, bet=None):
+    """The bet's report with every bet-level slot filled; render(greeting=...) per recipient."""
+    from email_template import REPORT
+    return REPORT.partial(**report_values(adv, image_url, bet))
+
+def html_report(adv: "Advantage", image_url: str, bet=None, greeting: str = "") -> str:
+    """One finished email in a single render (no partial), e.g. for benchmarks."""
+    from email_template import REPORT
+    return REPORT.render(report_values(adv, image_url, bet), greeting=greeting)
+
+def report_subject(bet) -> str:
+    return f"{bet.title} — Weekly Update ({dt.date.today().isoformat()})"
+
+def send_email_with_brevo(html, bet=None, client=None, outbox=None, week=None, subject=None):
+    """Send the report as one message per recipient, in batches over a pooled session (see delivery.py).
+       With an outbox, recipients already sent this week's report are skipped and every batch's
+       outcome is recorded. Raises if any batch still fails after retries."""
+    from delivery import BrevoClient
+    bet = bet or load_bets()[0]
     if not BREVO_API_KEY: raise RuntimeError("BREVO_API_KEY missing")
-    to_list = parse_recipients(TO_EMAILS_RAW)
+    to_list = parse_recipients(bet.recipients or TO_EMAILS_RAW)
     if not to_list: raise RuntimeError("REPORT_TO_EMAIL(S) missing")
 
-    payload = {
-        "sender": {"email": FROM_EMAIL or "no-reply@example.com", "name": "Marty vs Winslow"},
-        "to": to_list,
-        "subject": f"Marty vs Winslow — Weekly Update ({dt.date.today().isoformat()})",
+    on_result = None
+    if outbox is not None:
+        todo = outbox.pending(week, bet.id, to_list)
+        if len(todo) < len(to_list):
+            print(f"{bet.id}: {len(to_list) - len(todo)} of {len(to_list)} recipients already sent for {week}")
+        to_list = todo
+        if not to_list:
+            return {"sent": [], "failed": {}}
+        def record(batch, ok, detail):
+            for r in batch:
+                outbox.record(week, bet.id, r["email"], "sent" if ok else "failed", None if ok else detail)
+        on_result = record
+
+    message = {
+        "sender": {"email": FROM_EMAIL or "no-reply@example.com", "name": bet.title},
+        "subject": subject or report_subject(bet),
         "htmlContent": html
     }
 
-    r = requests.post(
-        "https://api.brevo.com/v3/smtp/email",
-        headers={"accept":"application/json","content-type":"application/json","api-key":BREVO_API_KEY},
-        json=payload, timeout=45
-    )
-    if r.status_code not in (200,201,202):
-        print("Brevo error:", r.status_code, r.text)
-        r.raise_for_status()
-    print("Brevo accepted:", r.text[:300])
-
-def main():
-    with open(HISTORY_PATH, "r", encoding="utf-8") as f:
-        history = json.load(f)
-    rows = clean_rows(history)
-    if not rows: raise SystemExit("No data rows")
-
-    # Generate chart PNG and commit so Pages serves it
-    make_chart_png(rows, CHART_PATH)
-    commit_chart_if_changed()
+    own_client = client is None
+    client = client or BrevoClient(BREVO_API_KEY)
+    try:
+        result = client.send(message, to_list, on_result)
+    finally:
+        if own_client: client.close()
+    if result["failed"]:
+        raise RuntimeError(f"Brevo rejected {len(result['failed'])} of {len(to_list)} recipients")
+    print(f"Brevo accepted: {len(result['sent'])} recipients")
+    return result
+
+def update_chart(adv: "Advantage", bet) -> bool:
+    """Render a bet's chart unless its inputs are unchanged. Returns True if a new PNG was rendered."""
+    params, path = chart_params(bet), bet.chart_path
+    digest, cached = chart_input_hash(adv, params), read_chart_cache(path)
+    if cached.get("hash") == digest and path.exists():
+        print(f"{bet.id}: chart inputs unchanged ({digest[:12]}); skipped render (~{cached.get('render_s', 0):.2f}s saved)")
+        return False
+    from chart_output import size_report
+    t0 = time.perf_counter()
+    sizes = make_chart_png(adv, path, params)
+    render_s = time.perf_counter() - t0
+    metrics.observe("chart_render", render_s, bet=bet.id)
+    metrics.incr("bytes_written", sum(v for k, v in sizes.items() if k in ("png", "svg")), file="chart")
+    write_chart_cache(path, digest, render_s, sizes)
+    print(f"{bet.id}: chart rendered in {render_s:.2f}s; {size_report(sizes)}")
+    return True
+
+def render_bet(bet) -> bool:
+    """Process-pool worker: load the (memory-mapped) history, run the bet's analytics, render its chart."""
+    adv = load_advantage(bet, report_columns())
+    return bool(len(adv)) and update_chart(chart_view(adv), bet)
+
+def render_all(bets, max_workers=RENDER_WORKERS):
+    """Render every bet's chart, fanned out across processes; returns the paths that changed."""
+    if len(bets) == 1 or WARM_RENDERERS:
+        rendered = [render_bet(b) for b in bets]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            rendered = list(pool.map(render_bet, bets))
+    return [b.chart_path for b, r in zip(bets, rendered) if r]
+
+def main(dry_run: bool = False, html_out: Path = None, client=None, git: bool = True):
+    """Weekly job for every bet. dry_run: build the HTML only (no chart render, git, email or outbox).
+       Reruns in the same ISO week resume from the outbox: finished messages are not re-rendered
+       and recipients already sent are skipped. A long-running caller may pass its own BrevoClient;
+       git=False renders changed charts but leaves them uncommitted."""
+    from outbox import Outbox, report_week
+    metrics.start("report")
+    bets = load_bets()
+    with metrics.span("load_columns"):
+        columns = report_columns()              # loaded once, shared by every bet
+    metrics.incr("rows_processed", len(columns[0]))
+    with metrics.span("load_advantage"):
+        advs = {b.id: load_advantage(b, columns) for b in bets}
+    if not any(len(a) for a in advs.values()): raise SystemExit("No data rows")
+    for b in bets:
+        if not len(advs[b.id]): print(f"{b.id}: no data rows yet; skipped")
+    bets = [b for b in bets if len(advs[b.id])]
+
+    week, box = report_week(), (None if dry_run else Outbox())
+    resumed = {b.id for b in bets if box is not None and box.message(week, b.id)}
+
+    if not dry_run and len(resumed) < len(bets):
+        with metrics.span("render_charts"):
+            changed = render_all([b for b in bets if b.id not in resumed])
+        if changed and not git:
+            print(f"{len(changed)} chart(s) changed; git disabled, not committed")
+        elif changed:
+            t0 = time.perf_counter()
+            commit_chart_if_changed(changed)
+            print(f"git took {time.perf_counter() - t0:.2f}s for {len(changed)} chart(s)")
+        else:
+            print("No chart changed; skipped git add/diff/commit/push")
 
     pages = compute_pages_url()
-    html = html_report(rows, f"{pages}/images/{CHART_PATH.name}" if pages else "")
-
-    send_email_with_brevo(html)
+    own_client = client is None
+    if not dry_run and own_client:
+        from delivery import BrevoClient
+        if not BREVO_API_KEY: raise RuntimeError("BREVO_API_KEY missing")
+        client = BrevoClient(BREVO_API_KEY)       # one pooled session for every bet's email
+    failures = []
+    for bet in bets:
+        if bet.id in resumed:
+            msg = box.message(week, bet.id)
+            html, subject = msg["html"], msg["subject"]
+            print(f"{bet.id}: resuming {week} from the outbox")
+        else:
+            image = bet.chart_path.relative_to(ROOT).as_posix()
+            with metrics.span("html_render"):
+                tpl = report_template(advs[bet.id], f"{pages}/{image}" if pages else "", bet)   # once per bet
+            # Every recipient gets the same copy (the greeting slot stays empty); a per-recipient
+            # slot would be filled here with tpl.render(greeting=...) for each of them
+            html, subject = tpl.render(), report_subject(bet)
+            if box is not None:
+                box.add_message(week, bet.id, subject, html)
+        if html_out:
+            out = Path(html_out) if len(bets) == 1 else Path(html_out).with_name(f"{Path(html_out).stem}-{bet.id}{Path(html_out).suffix}")
+            out.write_text(html, encoding="utf-8")
+            print(f"Wrote {out}")
+
+        if not dry_run:
+            try:
+                with metrics.span("send", bet=bet.id):
+                    send_email_with_brevo(html, bet, client, box, week, subject)
+            except RuntimeError as e:
+                failures.append(f"{bet.id}: {e}")    # keep going; the next run resumes the rest
+    if client is not None and own_client:
+        client.close()
+    if failures:
+        raise RuntimeError("; ".join(failures))
+    if box is not None:
+        box.compact()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,126 @@
+# scripts/email_template.py
+# The weekly email layout, compiled once into Template objects.
+# A Template parses its layout once into a frame [static, slot, static, slot, ..., static] with
+# the static text pre-joined; render() copies the frame, drops the values into the slot
+# positions and joins (no format-string parsing per call). partial() fills some slots ahead of
+# time and merges them into the static text. email_report fills everything that is the same
+# for a bet once, so each personalized copy only costs the remaining per-recipient slots:
+#   tpl = report_template(adv, image_url, bet)         # once per bet
+#   html = tpl.render(greeting="<p>Hi Ann,</p>")        # once per recipient
+# Benchmark against the f-string version: python scripts/bench_email.py
+
+from string import Formatter
+
+class Template:
+    """Layout with {name} slots ({{ and }} are literal braces)."""
+
+    def __init__(self, text: str = "", _frame=None, **defaults):
+        if _frame is None:
+            _frame = []
+            for literal, name, _, _ in Formatter().parse(text):
+                _frame.append(literal)
+                if name is not None:
+                    _frame.append((name,))
+        frame = [""]                                  # merge adjacent static text
+        for part in _frame:
+            if isinstance(part, tuple):
+                frame += [part, ""]
+            else:
+                frame[-1] += part
+        self.frame = frame
+        self.positions = [(i, part[0]) for i, part in enumerate(frame) if isinstance(part, tuple)]
+        self.slots = tuple(dict.fromkeys(name for _, name in self.positions))
+        self.defaults = {k: v for k, v in defaults.items() if k in self.slots}
+        self._by_index = [(i, self.slots.index(name)) for i, name in self.positions]
+
+    def render(self, values: dict = None, **more) -> str:
+        if self.defaults or (values and more):
+            v = {**self.defaults, **(values or {}), **more}
+        else:
+            v = values or more
+        out = self.frame.copy()
+        for i, name in self.positions:
+            out[i] = str(v[name])
+        return "".join(out)
+
+    def fill(self, *args) -> str:
+        """Positional render: one str per slot, in `slots` order (fastest path, for tight loops)."""
+        out = self.frame.copy()
+        for i, k in self._by_index:
+            out[i] = args[k]
+        return "".join(out)
+
+    def partial(self, **values) -> "Template":
+        """Fill `values` now; every other slot stays a slot (defaults carry over)."""
+        frame = [str(values[p[0]]) if isinstance(p, tuple) and p[0] in values else p for p in self.frame]
+        return Template(_frame=frame, **self.defaults)
+
+TD = "padding:8px;border-bottom:1px solid #e5e7eb"
+TH = "padding:8px;border-bottom:1px solid #e5e7eb;"
+
+ROW = Template(
+    "<tr>"
+    f"<td style='{TD}'>{{date}}</td>"
+    f"<td style='{TD}'>{{b_cap}}</td>"
+    f"<td style='{TD}'>{{a_cap}}</td>"
+    f"<td style='{TD}'>{{name}}</td>"
+    f"<td style='{TD}'>"
+    "<span style='border:1px solid {pill};border-radius:999px;padding:3px 8px;color:{pill};font-size:12px'>{pct}</span>"
+    "</td></tr>"
+)
+
+# Per-recipient slots: greeting (default empty)
+REPORT = Template("""<!doctype html>
+<html><body style="font-family:-apple-system,Segoe UI,Roboto,Helvetica,Arial,sans-serif;color:#0b1221;background:#ffffff;margin:0;padding:16px;">
+  <div style="max-width:720px;margin:0 auto;">{greeting}
+    <h2 style="margin:0 0 4px 0;">{title} — Weekly Update</h2>
+    <div style="color:#6b7280;margin-bottom:12px;">{a_ticker} vs {b_ticker} market capitalization • Ends {end_str}</div>
+
+    <div style="background:#f8fafc;border-radius:12px;padding:14px 16px;margin-bottom:12px;">
+      <table role="presentation" style="width:100%;border-collapse:collapse">
+        <tr>
+          <td style="padding:6px 0;width:33%;">
+            <div style="color:#6b7280;font-size:13px;">Days left</div>
+            <div style="font-weight:700;font-size:22px;">{days_left}</div>
+          </td>
+          <td style="padding:6px 0;width:33%;">
+            <div style="color:#6b7280;font-size:13px;">Currently winning</div>
+            <div style="font-weight:800;font-size:22px;color:{leader_color}">{leader}</div>
+          </td>
+          <td style="padding:6px 0;width:33%;">
+            <div style="color:#6b7280;font-size:13px;">% ahead</div>
+            <div style="font-weight:700;font-size:22px;">{ahead} <span style="color:#6b7280;font-size:12px">(Δ vs 7d: {delta7})</span></div>
+          </td>
+        </tr>
+      </table>
+      <div style="color:#6b7280;font-size:12px;margin-top:4px">Δ {deltas}</div>
+      <div style="color:#6b7280;font-size:12px;margin-top:4px">% ahead = (leader − loser) / loser</div>
+    </div>
+
+    {img_tag}
+
+    <div style="background:#f8fafc;border-radius:12px;padding:14px 16px;margin-top:12px;">
+      <div style="display:flex;justify-content:space-between;align-items:baseline;margin-bottom:8px;">
+        <strong>Last 7 entries</strong>
+        <span style="color:#6b7280;font-size:12px;">Updated {latest_date}</span>
+      </div>
+      <table style="width:100%;border-collapse:collapse;">
+        <thead>
+          <tr>
+            <th align="left" style="TH">Date</th>
+            <th align="left" style="TH">{b_ticker} Market Cap</th>
+            <th align="left" style="TH">{a_ticker} Market Cap</th>
+            <th align="left" style="TH">Leader</th>
+            <th align="left" style="TH">% Ahead</th>
+          </tr>
+        </thead>
+        <tbody>
+          {rows}
+        </tbody>
+      </table>
+      {link_html}
+    </div>
+
+    <div style="color:#6b7280;font-size:12px;margin-top:12px;">This email was sent automatically by GitHub Actions using Brevo.</div>
+  </div>
+</body></html>""".replace('style="TH"', f'style="{TH}"'), greeting="")
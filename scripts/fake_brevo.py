@@ -0,0 +1,56 @@
+# scripts/fake_brevo.py
+# Local stand-in for Brevo's POST /v3/smtp/email, for exercising delivery.py offline:
+#   python scripts/fake_brevo.py --port 8025 [--fail-every 3] [--log sent.jsonl]
+#   BREVO_API_URL=http://127.0.0.1:8025/v3/smtp/email BREVO_API_KEY=test python scripts/mvw.py report
+# Every accepted request is appended to --log as one JSON line; --fail-every N answers
+# every Nth request with a 503 so retries can be observed.
+
+import argparse, itertools, json, threading, uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def make_handler(log_path, fail_every):
+    counter, lock = itertools.count(1), threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("content-length", 0)))
+            n = next(counter)
+            if not self.headers.get("api-key"):
+                return self._reply(401, {"code": "unauthorized", "message": "Key not found"})
+            if fail_every and n % fail_every == 0:
+                return self._reply(503, {"code": "unavailable", "message": "try again"})
+            payload = json.loads(body or b"{}")
+            if log_path:
+                with lock, open(log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(payload) + "\n")
+            versions = payload.get("messageVersions") or [{"to": payload.get("to", [])}]
+            self._reply(201, {"messageIds": [f"<{uuid.uuid4()}@fake-brevo>" for _ in versions]})
+
+        def _reply(self, status, obj):
+            data = json.dumps(obj).encode()
+            self.send_response(status)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+def serve(port: int = 8025, log_path=None, fail_every: int = 0):
+    """Start the stand-in on a background thread; returns the server (call .shutdown() to stop)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(log_path, fail_every))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local stand-in for the Brevo transactional email API")
+    ap.add_argument("--port", type=int, default=8025)
+    ap.add_argument("--log", help="append accepted payloads to this JSONL file")
+    ap.add_argument("--fail-every", type=int, default=0, help="answer every Nth request with 503")
+    args = ap.parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.log, args.fail_every))
+    print(f"fake Brevo listening on http://127.0.0.1:{args.port}/v3/smtp/email")
+    server.serve_forever()
@@ -1,45 +1,139 @@
-import json, os, datetime as dt
-import yfinance as yf
-
-OUT_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "history.json")
-DATE = dt.date.today().isoformat()
-
-TICKERS = {
-    "bp": "BP",        # BP plc (NYSE)
-    "coin": "COIN"     # Coinbase Global
-}
-
-def get_market_cap(ticker):
-    info = yf.Ticker(ticker).fast_info
-    # Prefer market_cap if present; fall back to price * shares if available
-    mc = getattr(info, "market_cap", None)
-    if mc is None:
-        price = getattr(info, "last_price", None)
-        shares = getattr(info, "shares", None)
-        if price and shares:
-            mc = float(price) * float(shares)
-    return float(mc) if mc else None
-
-bp_mc = get_market_cap(TICKERS["bp"])
-coin_mc = get_market_cap(TICKERS["coin"])
-
-if bp_mc is None or coin_mc is None:
-    raise SystemExit("Failed to fetch market caps.")
-
-os.makedirs(os.path.dirname(OUT_PATH), exist_ok=True)
-history = []
-if os.path.exists(OUT_PATH):
-    with open(OUT_PATH, "r") as f:
-        history = json.load(f)
-
-# avoid duplicate entry if already added today
-if not any(r["date"] == DATE for r in history):
-    history.append({
-        "date": DATE,
-        "bpMarketCap": round(bp_mc),
-        "coinMarketCap": round(coin_mc)
-    })
-
-with open(OUT_PATH, "w") as f:
-    json.dump(history, f, indent=2)
-print(f"Added {DATE}: BP={bp_mc:.0f}, COIN={coin_mc:.0f}")
+import argparse, bisect
+import datetime as dt
+
+import history_store, metrics
+from bets import all_tickers, column, load_bets
+from fetch_engine import fetch_all
+from providers import market_cap, provider_from_env
+from quote_cache import CachedProvider, cache_from_env
+
+def timed(stage, fn):
+    """fn(ticker) wrapped in a per-ticker metrics span (fetch_all runs it on worker threads)."""
+    def call(t):
+        with metrics.span(stage, ticker=t):
+            return fn(t)
+    return call
+
+def tickers():
+    """Every ticker any bet in data/bets.json needs, fetched once each (sorted for a stable row layout)."""
+    return sorted(all_tickers(load_bets()))
+
+def parse_range(s: str):
+    start, sep, end = s.partition("..")
+    if not sep:
+        raise argparse.ArgumentTypeError("expected START..END, e.g. 2025-06-01..2025-06-30")
+    start = dt.date.fromisoformat(start)
+    end = dt.date.fromisoformat(end) if end else dt.date.today()
+    if end < start:
+        raise argparse.ArgumentTypeError("END is before START")
+    return start, end
+
+def missing_dates(start, end):
+    """Days in [start, end] not in the log. The trading layout leaves out days with no new
+       session on purpose (see history_store.py), so those are not gaps."""
+    have = {r["date"] for r in history_store.read_rows()}
+    days = (start + dt.timedelta(days=i) for i in range((end - start).days + 1))
+    if history_store.LAYOUT == "trading":
+        import trading_calendar
+        days = (d for d in days if trading_calendar.new_session(d))
+    return [d for d in days if d.isoformat() not in have]
+
+def backfill(provider, tickers, start, end):
+    """Fill calendar days in [start, end] that are missing from the store.
+       One bulk price-history request per ticker; cap = close * current shares outstanding.
+       Like the daily job (which runs after the US close), the row dated D holds the last close
+       before D, so non-trading days carry the previous close forward.
+    """
+    missing = missing_dates(start, end)
+    if not missing:
+        print(f"No gaps between {start} and {end}")
+        return 0
+
+    # Look back a week so a gap starting on a weekend/holiday still has a close to carry forward
+    lo, hi = missing[0] - dt.timedelta(days=7), missing[-1]
+    closes = fetch_all(tickers, timed("fetch_history", lambda t: provider.history(t, lo, hi)), timeout=60)
+    shares = fetch_all(tickers, timed("fetch_shares", lambda t: provider.get(t, "shares")))
+    for t in tickers:
+        if not closes[t] or not shares[t]:
+            raise SystemExit(f"Backfill failed: no price history or shares for {t}")
+
+    close_dates = {t: sorted(closes[t]) for t in tickers}
+    # Don't guess past the newest close: the last row it can fill is the day after it
+    newest = (dt.date.fromisoformat(min(ds[-1] for ds in close_dates.values())) + dt.timedelta(days=1)).isoformat()
+    rows = []
+    for d in (d for d in missing if d.isoformat() <= newest):
+        row = {"date": d.isoformat()}
+        for t in tickers:
+            i = bisect.bisect_left(close_dates[t], row["date"]) - 1     # last close strictly before D
+            if i < 0:
+                break
+            row[column(t)] = round(closes[t][close_dates[t][i]] * shares[t])
+        else:
+            rows.append(row)
+
+    added = history_store.merge_rows(rows)          # single rewrite of the log
+    metrics.incr("rows_added", added)
+    if added:
+        export()
+    print(f"Backfilled {added} of {len(missing)} missing days between {start} and {end}")
+    return added
+
+def export(appended=None):
+    """Refresh every file derived from the log: JSON/columnar exports, then the site summary."""
+    history_store.export_all(appended)
+    from build_summary import write_summary         # needs numpy (comes with yfinance/pandas)
+    with metrics.span("export", file="summary.json"):
+        metrics.incr("bytes_written", write_summary(), file="summary.json")
+
+def main(argv=None, provider=None, cache=None):
+    """Daily fetch (or --backfill). A long-running caller passes its own warm provider and cache."""
+    ap = argparse.ArgumentParser(description="Fetch today's market caps into the history store.")
+    ap.add_argument("--backfill", metavar="START..END", type=parse_range,
+                    help="fill missing days in a date range from bulk price history (END defaults to today)")
+    args = ap.parse_args(argv)
+
+    metrics.start("fetch")
+    if provider is None:
+        provider, cache = provider_from_env(), cache_from_env()
+        if cache is not None:
+            provider = CachedProvider(provider, cache)
+
+    # First run after the switch to the append-only log: import the legacy JSON array once
+    if not history_store.LOG_PATH.exists() and history_store.EXPORT_PATH.exists():
+        history_store.migrate_from_json()
+
+    ts = tickers()
+    if args.backfill:
+        backfill(provider, ts, *args.backfill)
+    else:
+        caps = fetch_all(ts, timed("fetch_ticker", lambda t: market_cap(provider, t)))
+        failed = [t for t in ts if caps[t] is None]
+        metrics.incr("fetch_failures", len(failed))
+        # Every ticker belongs to some bet, and a stored date is never rewritten (append_row,
+        # merge_rows), so a partial row could not be repaired later: fail and let a rerun retry
+        if failed:
+            raise SystemExit(f"Failed to fetch market caps for {', '.join(failed)}; nothing stored.")
+
+        # append_row skips the write if today is already stored
+        today = dt.date.today().isoformat()
+        row = {"date": today}
+        row.update({column(t): round(caps[t]) for t in ts})
+        prev = history_store.last_row() if history_store.LAYOUT == "trading" else None
+        if prev and history_store.off_session_repeat(row, prev):
+            print(f"No new session for {today} (repeats {prev['date']}); not stored")
+        else:
+            added = history_store.append_row(row)
+            metrics.incr("rows_added", int(added))
+            if added:
+                export([row])
+            print(f"{'Added' if added else 'Already stored'} {today}: "
+                  + ", ".join(f"{t}={caps[t]:.0f}" for t in ts))
+
+    if cache is not None:
+        cache.save()
+        metrics.incr("quote_cache", cache.hits, result="hit")
+        metrics.incr("quote_cache", cache.misses, result="miss")
+        print(cache.summary())
+
+if __name__ == "__main__":
+    main()
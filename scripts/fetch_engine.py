@@ -0,0 +1,57 @@
+# scripts/fetch_engine.py
+# Runs one lookup per ticker concurrently on a bounded set of worker threads.
+# Quote lookups are blocking HTTP round trips, so threads overlap the waiting;
+# wall time becomes ~the slowest ticker instead of the sum of all of them.
+# `fetch` is any callable ticker -> value, so a local fake can stand in for yfinance.
+
+import queue, sys, threading, time
+
+def fetch_all(tickers, fetch, max_workers: int = 8, timeout: float = 20.0) -> dict:
+    """Call fetch(ticker) for every ticker; returns {ticker: value}.
+       A ticker whose call raises or runs longer than `timeout` seconds (measured
+       from when its call starts, not from when it was queued) maps to None.
+    """
+    tickers = list(dict.fromkeys(tickers))          # de-dupe, keep order
+    results = {t: None for t in tickers}
+    todo, done = queue.Queue(), queue.Queue()
+    for t in tickers:
+        todo.put(t)
+    started = {}
+
+    def worker():
+        while True:
+            try:
+                t = todo.get_nowait()
+            except queue.Empty:
+                return
+            started[t] = time.monotonic()
+            try:
+                done.put((t, fetch(t), None))
+            except Exception as e:
+                done.put((t, None, e))
+
+    def spawn():
+        # Daemon threads: a hung lookup must not keep the process alive after we give up on it
+        threading.Thread(target=worker, daemon=True).start()
+
+    for _ in range(max(1, min(max_workers, len(tickers)))):
+        spawn()
+
+    remaining = set(tickers)
+    while remaining:
+        try:
+            t, value, err = done.get(timeout=0.05)
+            if t in remaining:
+                remaining.discard(t)
+                if err is not None:
+                    print(f"fetch {t} failed: {err!r}", file=sys.stderr)
+                else:
+                    results[t] = value
+        except queue.Empty:
+            pass
+        now = time.monotonic()
+        for t in [t for t in remaining if t in started and now - started[t] > timeout]:
+            print(f"fetch {t} timed out after {timeout:.0f}s", file=sys.stderr)
+            remaining.discard(t)
+            spawn()                                 # replace the stuck worker
+    return results
@@ -0,0 +1,382 @@
+# scripts/history_store.py
+# Append-only history store.
+#   data/history.jsonl — one compact JSON row per line, sorted by date (the source of truth)
+#   data/history.idx   — sidecar index holding the last stored date
+#   data/history.json  — compatibility export (JSON array)
+#   data/history.bin   — columnar export (see columnar.py), memory-mapped by email_report.py.
+#                        Not committed (gitignored): a new row moves every column's offset, so it
+#                        would be a full binary rewrite in git each day. ensure_columnar() builds it
+#                        from the log when it is missing or older than the log.
+#   data/history/YYYY-MM.json + manifest.json — monthly shards for range reads; the manifest lists
+#                        each shard's date range, row count and sha256. Past months never change,
+#                        so their files (and hashes) stay byte-identical and can be cached forever.
+# The daily append writes one line and the 10-byte index without loading the log, and extends
+# history.json in place (append_json rewrites only its closing bracket). The current month's
+# shard, the manifest and summary.json are rebuilt from the log after each new row;
+# a rerun that adds no row writes nothing.
+# Every rewrite goes through durable.atomic_write (temp file, fsync, rename), and appends are
+# fsync'ed; a torn last line left by a crash mid-append is ignored and trimmed on the next append.
+# history.bin always ends with a sha256 footer (see durable.py). history.json gets one only with
+# MVW_JSON_CHECKSUM=1, since plain JSON parsers reject it (the readers here strip and verify it).
+# Shard layout (MVW_HISTORY_LAYOUT; history.json and history.bin keep every row of the log):
+#   calendar  one row per stored day (default)
+#   runs      a run of days repeating the same values is stored once, with "until": <last day>
+#             (runs are cut at month ends, so past shards stay unchanged)
+#   trading   repeats on days that hold no new NYSE session (trading_calendar.new_session)
+#             are not stored; a changed value is always kept. The daily fetch then skips such
+#             rows in the log too, and `history_store.py prune` drops them from an existing log.
+# A stored row stands for every day up to its "until", or up to the day before the next row;
+# each manifest entry's "covers" is that last day for the shard's final row. read_range(...,
+# calendar=True) expands rows back to one per day, only for the range it returns.
+
+import datetime as dt
+import hashlib, json, os, sys
+from pathlib import Path
+
+import durable, metrics
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = ROOT / "data"
+LOG_PATH = DATA_DIR / "history.jsonl"
+INDEX_PATH = DATA_DIR / "history.idx"
+EXPORT_PATH = DATA_DIR / "history.json"
+BIN_PATH = DATA_DIR / "history.bin"
+SHARD_DIR = DATA_DIR / "history"
+MANIFEST_PATH = SHARD_DIR / "manifest.json"
+JSON_CHECKSUM = os.environ.get("MVW_JSON_CHECKSUM", "0") == "1"
+LAYOUTS = ("calendar", "runs", "trading")
+LAYOUT = os.environ.get("MVW_HISTORY_LAYOUT", "calendar").strip().lower() or "calendar"
+
+def _dumps(row) -> str:
+    return json.dumps(row, separators=(",", ":"))
+
+def _write_index(date: str):
+    durable.write_text(INDEX_PATH, date + "\n")
+
+def _tail_rows():
+    """Complete rows in the last 4 KB of the log (the newest few days)."""
+    if not LOG_PATH.exists():
+        return []
+    with open(LOG_PATH, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 4096))
+        tail = f.read()
+    lines = tail[:tail.rfind(b"\n") + 1].splitlines()                    # complete lines only
+    if size > 4096:
+        lines = lines[1:]                                                # the first may be cut
+    return [json.loads(ln) for ln in lines if ln.strip()]
+
+def last_row():
+    """Last row of the log, reading only the end of the file."""
+    rows = _tail_rows()
+    return rows[-1] if rows else None
+
+def _tail_date():
+    row = last_row()
+    return row["date"] if row else None
+
+def last_date():
+    """Last stored ISO date (from the sidecar index; rebuilt from the log tail if missing)."""
+    try:
+        d = INDEX_PATH.read_text().strip()
+        if d: return d
+    except FileNotFoundError:
+        pass
+    d = _tail_date()
+    if d: _write_index(d)
+    return d
+
+def read_rows():
+    if not LOG_PATH.exists():
+        return []
+    with open(LOG_PATH, "r", encoding="utf-8") as f:
+        return [json.loads(ln) for ln in f if ln.endswith("\n") and ln.strip()]
+
+def _trim_torn_tail():
+    """Cut a partial last line (a crash mid-append) so the next append starts on a new line."""
+    with open(LOG_PATH, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if not size:
+            return
+        f.seek(max(0, size - 4096))
+        tail = f.read()
+        if not tail.endswith(b"\n"):
+            f.truncate(size - len(tail) + tail.rfind(b"\n") + 1)
+
+def append_row(row) -> bool:
+    """Append one row. Returns False (and writes nothing) if its date is already covered.
+       Checks the log tail as well as the index: a crash between the fsync'ed append and the
+       index update leaves the index one row behind."""
+    last = max(filter(None, (last_date(), _tail_date())), default=None)
+    if last is not None and row["date"] <= last:
+        return False
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    line = _dumps(row) + "\n"
+    if LOG_PATH.exists():
+        _trim_torn_tail()
+    with open(LOG_PATH, "a", encoding="utf-8") as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    metrics.incr("bytes_written", len(line.encode("utf-8")), file=LOG_PATH.name)
+    _write_index(row["date"])
+    return True
+
+def merge_rows(new_rows) -> int:
+    """Merge rows for dates not yet stored (e.g. a backfill) in a single rewrite of the log.
+       Existing rows win on conflicts. Returns how many rows were added."""
+    by_date = {r["date"]: r for r in read_rows()}
+    added = 0
+    for r in new_rows:
+        if r["date"] not in by_date:
+            by_date[r["date"]] = r
+            added += 1
+    if not added:
+        return 0
+    rows = [by_date[d] for d in sorted(by_date)]
+    with durable.atomic_write(LOG_PATH) as f:
+        f.writelines(_dumps(r) + "\n" for r in rows)
+    metrics.incr("bytes_written", LOG_PATH.stat().st_size, file=LOG_PATH.name)
+    _write_index(rows[-1]["date"])
+    return added
+
+def migrate_from_json(src: Path = None) -> int:
+    """One-time migration of the legacy JSON array into the JSONL log."""
+    src = src or EXPORT_PATH
+    if LOG_PATH.exists():
+        raise RuntimeError(f"{LOG_PATH} already exists; refusing to overwrite")
+    history = read_json_export(src)
+    by_date = {}
+    for r in history:
+        if r and r.get("date"):
+            by_date.setdefault(r["date"], r)   # first row wins, like the old any(...) check
+    rows = [by_date[d] for d in sorted(by_date)]
+    with durable.atomic_write(LOG_PATH) as f:
+        f.writelines(_dumps(r) + "\n" for r in rows)
+    if rows: _write_index(rows[-1]["date"])
+    return len(rows)
+
+def export_json(dst: Path = None) -> int:
+    """Write the legacy JSON array (same layout as before) for index.html / email_report.py."""
+    dst = dst or EXPORT_PATH
+    rows = read_rows()
+    with durable.atomic_write(dst, footer=JSON_CHECKSUM) as f:
+        json.dump(rows, f, indent=2)
+    metrics.incr("bytes_written", dst.stat().st_size, file=dst.name)
+    return len(rows)
+
+def _json_tail_date(f, size: int):
+    """Date of the last row in the JSON export, if the file ends like json.dump(..., indent=2) does."""
+    f.seek(max(0, size - 512))
+    tail = f.read()
+    i = tail.rfind(b'"date": "')
+    if not tail.endswith(b"\n  }\n]") or i < 0:
+        return None
+    return tail[i + 9:i + 19].decode("ascii")
+
+def append_json(rows, dst: Path = None) -> bool:
+    """Append rows just appended to the log to the JSON export in place: only the closing "]" is
+       rewritten, and the bytes match a full export_json. Returns False (nothing written) if the
+       file cannot be extended: missing, checksummed, or not ending on the log row before `rows`
+       (e.g. a torn earlier append); call export_json then."""
+    dst = dst or EXPORT_PATH
+    tail = [r["date"] for r in _tail_rows()]
+    if JSON_CHECKSUM or not rows or not dst.exists() or rows[0]["date"] not in tail[1:]:
+        return False
+    prev = tail[tail.index(rows[0]["date"]) - 1]
+    with open(dst, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if _json_tail_date(f, size) != prev:
+            return False
+        data = ("," + json.dumps(rows, indent=2)[1:-2] + "\n]").encode("utf-8")
+        f.seek(size - 2)                            # drop the closing "\n]"
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    metrics.incr("bytes_written", len(data), file=dst.name)
+    return True
+
+def read_json_export(src: Path = None):
+    """The JSON array export; a checksum footer, if present, is verified and stripped."""
+    src = src or EXPORT_PATH
+    return json.loads(durable.read_verified(src))
+
+def export_columnar(dst: Path = None) -> int:
+    dst = dst or BIN_PATH
+    import columnar
+    n = columnar.write(dst, read_rows())
+    metrics.incr("bytes_written", dst.stat().st_size, file=dst.name)
+    return n
+
+def shard_name(date: str) -> str:
+    return f"{date[:7]}.json"                  # monthly: 2026-07.json
+
+def _values(row) -> dict:
+    return {k: v for k, v in row.items() if k not in ("date", "until")}
+
+def _shift(date: str, days: int) -> str:
+    return (dt.date.fromisoformat(date) + dt.timedelta(days=days)).isoformat()
+
+def compact(rows, layout: str = None):
+    """Date-sorted log rows as the shards store them for `layout` (default: LAYOUT; see the header)."""
+    layout = layout or LAYOUT
+    if layout not in LAYOUTS:
+        raise ValueError(f"unknown history layout {layout!r} (expected one of {', '.join(LAYOUTS)})")
+    if layout == "calendar":
+        return list(rows)
+    out = []
+    for r in rows:
+        prev = out[-1] if out else None
+        if prev is not None and _values(r) == _values(prev):
+            if (layout == "runs" and prev.get("until", prev["date"]) == _shift(r["date"], -1)
+                    and shard_name(r["date"]) == shard_name(prev["date"])):
+                prev["until"] = r["date"]
+                continue
+            if layout == "trading" and off_session_repeat(r, prev):
+                continue
+        out.append(dict(r))
+    return out
+
+def off_session_repeat(row, prev) -> bool:
+    """True if `row` repeats `prev`'s values on a day that holds no new NYSE session."""
+    import trading_calendar
+    return _values(row) == _values(prev) and not trading_calendar.new_session(dt.date.fromisoformat(row["date"]))
+
+def prune_log() -> int:
+    """Rewrite the log without off-session repeats (the trading layout, applied to the source of
+       truth). Returns how many rows were dropped."""
+    rows = read_rows()
+    kept = compact(rows, "trading")
+    if len(kept) < len(rows):
+        with durable.atomic_write(LOG_PATH) as f:
+            f.writelines(_dumps(r) + "\n" for r in kept)
+        _write_index(kept[-1]["date"])
+    return len(rows) - len(kept)
+
+def _spans(rows, covers: str):
+    """(row, last day it stands for) for one shard's stored rows."""
+    for i, r in enumerate(rows):
+        yield r, r.get("until") or (_shift(rows[i + 1]["date"], -1) if i + 1 < len(rows) else covers)
+
+def _expand(row, last: str, start: str = None, end: str = None):
+    """One calendar row per day from row["date"] to `last`, clipped to [start, end]."""
+    values = _values(row)
+    d, last = dt.date.fromisoformat(max(row["date"], start or "")), dt.date.fromisoformat(min(last, end or "9999"))
+    while d <= last:
+        yield {"date": d.isoformat(), **values}
+        d += dt.timedelta(days=1)
+
+def _shard_bytes(rows) -> bytes:
+    return ("[\n" + ",\n".join(_dumps(r) for r in rows) + "\n]\n").encode("utf-8")
+
+def export_shards() -> int:
+    """Write data/history/YYYY-MM.json shards and their manifest. Shards whose bytes are unchanged
+       are not rewritten, and shards for months no longer in the log are removed.
+       Returns how many shard files were (re)written."""
+    groups, layout = {}, LAYOUT
+    for r in compact(read_rows(), layout):
+        groups.setdefault(shard_name(r["date"]), []).append(r)
+    SHARD_DIR.mkdir(parents=True, exist_ok=True)
+    entries, written, names = [], 0, sorted(groups)
+    for k, name in enumerate(names):
+        rows, data = groups[name], _shard_bytes(groups[name])
+        path = SHARD_DIR / name
+        if not path.exists() or path.read_bytes() != data:
+            durable.write_bytes(path, data)
+            metrics.incr("bytes_written", len(data), file="shards")
+            written += 1
+        covers = rows[-1].get("until") or (_shift(groups[names[k + 1]][0]["date"], -1)
+                                           if k + 1 < len(names) and layout != "calendar" else rows[-1]["date"])
+        entries.append({"file": name, "start": rows[0]["date"], "end": rows[-1]["date"], "covers": covers,
+                        "rows": len(rows), "sha256": hashlib.sha256(data).hexdigest()})
+    for stale in SHARD_DIR.glob("????-??.json"):
+        if stale.name not in groups:
+            stale.unlink()
+    manifest = {"version": 1, "layout": layout, "rows": sum(e["rows"] for e in entries),
+                "first": entries[0]["start"] if entries else None,
+                "last": entries[-1]["end"] if entries else None, "shards": entries}
+    durable.write_text(MANIFEST_PATH, json.dumps(manifest, indent=1) + "\n")
+    return written
+
+def read_manifest():
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def read_range(start: str = None, end: str = None, include_first: bool = False, calendar: bool = False):
+    """Rows in [start, end], opening only the shards whose range overlaps it.
+       include_first also returns the first shard (e.g. for "since start" figures).
+       With a compacted layout, rows are returned as stored (a row may start before `start`),
+       or with calendar=True expanded to one row per day inside the range.
+       Raises ValueError if a shard does not match its manifest hash."""
+    manifest = read_manifest()
+    compacted = manifest.get("layout", "calendar") != "calendar"
+    out = []
+    for i, e in enumerate(manifest["shards"]):
+        whole = include_first and i == 0
+        covers = e.get("covers", e["end"])
+        if (start is not None and covers < start and not whole) or (end is not None and e["start"] > end):
+            continue
+        data = (SHARD_DIR / e["file"]).read_bytes()
+        if hashlib.sha256(data).hexdigest() != e["sha256"]:
+            raise ValueError(f"{e['file']} does not match manifest.json; run history_store.py export")
+        rows = json.loads(data)
+        if not compacted:
+            out += [r for r in rows if (whole or start is None or r["date"] >= start)
+                    and (end is None or r["date"] <= end)]
+            continue
+        for r, last in _spans(rows, covers):
+            if (whole or start is None or last >= start) and (end is None or r["date"] <= end):
+                out += _expand(r, last, None if whole else start, end) if calendar else [r]
+    out.sort(key=lambda r: r["date"])
+    return out
+
+def verify_all():
+    """Check every derived file against its checksum; returns one status line per file.
+       Raises ValueError on the first mismatch."""
+    out = []
+    for path in (EXPORT_PATH, BIN_PATH):
+        if path.exists():
+            out.append(f"{path.name}: {'ok' if durable.verify(path) else 'no checksum footer'}")
+    if MANIFEST_PATH.exists():
+        n = len(read_range(include_first=True) if read_manifest()["shards"] else [])
+        out.append(f"{SHARD_DIR.name}/: ok ({n} rows)")
+    return out
+
+def export_all(appended=None):
+    """Refresh every derived file after the log changes. `appended` (rows just appended to the
+       log) lets the JSON export be extended in place instead of rewritten."""
+    with metrics.span("export", file=EXPORT_PATH.name):
+        if not (appended and append_json(appended)):
+            export_json()
+    with metrics.span("export", file="shards"):
+        export_shards()
+
+def ensure_columnar(dst: Path = None) -> bool:
+    """Build history.bin from the log if it is missing or older than the log (it is a local
+       artifact, see the header). Returns True if it was (re)built."""
+    dst = dst or BIN_PATH
+    if not LOG_PATH.exists() or (dst.exists() and dst.stat().st_mtime_ns >= LOG_PATH.stat().st_mtime_ns):
+        return False
+    with metrics.span("export", file=dst.name):
+        export_columnar(dst)
+    return True
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else ""
+    if cmd == "migrate":
+        print(f"Migrated {migrate_from_json()} rows into {LOG_PATH.name}")
+    elif cmd == "export":
+        export_all()
+        export_columnar()
+        print(f"Exported {EXPORT_PATH.name}, {BIN_PATH.name} and {SHARD_DIR.name}/{MANIFEST_PATH.name}")
+    elif cmd == "prune":
+        print(f"Dropped {prune_log()} off-session repeat rows from {LOG_PATH.name}")
+        export_all()
+    elif cmd == "verify":
+        try:
+            print("\n".join(verify_all()))
+        except ValueError as e:
+            raise SystemExit(str(e))
+    else:
+        raise SystemExit("usage: history_store.py migrate|export|prune|verify")
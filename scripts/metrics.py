@@ -0,0 +1,113 @@
+# scripts/metrics.py
+# Run instrumentation: spans (wall time) and counters, stdlib only and thread-safe.
+#   with metrics.span("fetch_ticker", ticker="BP"): ...
+#   metrics.incr("bytes_written", n, file="history.bin")
+# fetch_caps.main / email_report.main call metrics.start(job); at exit the run is written to
+#   <MVW_METRICS_DIR or .cache/metrics>/<job>.json   spans (count, total/max seconds) + counters
+#   <job>.prom                                         Prometheus text format, when MVW_METRICS_PROM=1
+#                                                      (or MVW_METRICS_PROM=<path>)
+# and a one-line timing summary is printed. Without start() nothing is written, so library
+# code (history_store, delivery) is instrumented unconditionally. Spans recorded inside the
+# render process pool stay in the workers; the parent's render_charts span covers them.
+# A long-running process (mvw daemon) calls finish() after each job instead: it writes the run
+# and starts the next one from zero.
+
+import atexit, json, os, threading, time
+from contextlib import contextmanager
+from pathlib import Path
+
+import durable
+
+ROOT = Path(__file__).resolve().parents[1]
+METRICS_DIR = Path(os.environ.get("MVW_METRICS_DIR", ROOT / ".cache" / "metrics"))
+PROM = os.environ.get("MVW_METRICS_PROM", "")
+
+_lock = threading.Lock()
+_spans = {}       # (name, labels) -> [count, total_s, max_s]
+_counters = {}    # (name, labels) -> value
+_run = {}
+_at_exit = []
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def observe(name: str, seconds: float, **labels):
+    with _lock:
+        s = _spans.setdefault(_key(name, labels), [0, 0.0, 0.0])
+        s[0] += 1; s[1] += seconds; s[2] = max(s[2], seconds)
+
+@contextmanager
+def span(name: str, **labels):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - t0, **labels)
+
+def incr(name: str, n=1, **labels):
+    with _lock:
+        k = _key(name, labels)
+        _counters[k] = _counters.get(k, 0) + n
+
+def start(job: str):
+    """Start a job's run; its metrics are written when the process exits (or by finish())."""
+    if not _at_exit:
+        _at_exit.append(atexit.register(write))
+    _run.update(job=job, started=time.time(), t0=time.perf_counter())
+
+def snapshot() -> dict:
+    with _lock:
+        spans = [{"name": n, "labels": dict(l), "count": c, "seconds": round(t, 6), "max_seconds": round(m, 6)}
+                 for (n, l), (c, t, m) in sorted(_spans.items())]
+        counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(_counters.items())]
+    return {"job": _run.get("job"), "started": _run.get("started"),
+            "seconds": round(time.perf_counter() - _run["t0"], 6) if _run else None,
+            "spans": spans, "counters": counters}
+
+def _labels(job, labels) -> str:
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in [("job", job), *sorted(labels.items())]) + "}"
+
+def prometheus(*snaps: dict) -> str:
+    """Prometheus text for one or more runs (each metric family is listed once)."""
+    spans = [(s["job"], x) for s in snaps for x in s["spans"]]
+    counters = [(s["job"], c) for s in snaps for c in s["counters"]]
+    out = ["# HELP mvw_span_seconds_total Wall time spent in each span.",
+           "# TYPE mvw_span_seconds_total counter"]
+    out += [f"mvw_span_seconds_total{_labels(job, {'span': s['name'], **s['labels']})} {s['seconds']}" for job, s in spans]
+    out += ["# HELP mvw_span_count_total Times each span ran.", "# TYPE mvw_span_count_total counter"]
+    out += [f"mvw_span_count_total{_labels(job, {'span': s['name'], **s['labels']})} {s['count']}" for job, s in spans]
+    for name in dict.fromkeys(c["name"] for _, c in counters):
+        out.append(f"# TYPE mvw_{name}_total counter")
+        out += [f"mvw_{name}_total{_labels(job, c['labels'])} {c['value']}" for job, c in counters if c["name"] == name]
+    out.append("# TYPE mvw_run_seconds gauge")
+    out += [f"mvw_run_seconds{_labels(s['job'], {})} {s['seconds']}" for s in snaps]
+    return "\n".join(out) + "\n"
+
+def summary(snap: dict, top: int = 6) -> str:
+    totals = {}
+    for s in snap["spans"]:
+        totals[s["name"]] = totals.get(s["name"], 0.0) + s["seconds"]
+    parts = [f"{n} {t:.2f}s" for n, t in sorted(totals.items(), key=lambda kv: -kv[1])[:top]]
+    return f"Timing ({snap['job']}, {snap['seconds']:.2f}s): " + ", ".join(parts)
+
+def write():
+    if not _run:
+        return None
+    snap = snapshot()
+    METRICS_DIR.mkdir(parents=True, exist_ok=True)
+    (METRICS_DIR / f"{snap['job']}.json").write_text(json.dumps(snap, indent=1) + "\n")
+    if PROM:
+        path = METRICS_DIR / f"{snap['job']}.prom" if PROM == "1" else Path(PROM)
+        durable.write_text(path, prometheus(snap))     # atomic: textfile collectors read it any time
+    print(summary(snap))
+    return snap
+
+def finish():
+    """Write the current run now and reset every span and counter; returns the run's snapshot."""
+    snap = write()
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+    _run.clear()
+    return snap
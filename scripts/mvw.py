@@ -0,0 +1,154 @@
+# scripts/mvw.py
+# One CLI for the project:
+#   python scripts/mvw.py fetch [--backfill START..END]   daily market-cap update
+#   python scripts/mvw.py report [--dry-run] [--html F]   weekly chart + email
+#   python scripts/mvw.py render [--force] [--bet ID]     (re)render charts locally, no git/email
+#   python scripts/mvw.py charts [--bet ID] [--window W] [--theme T] [--scale N]
+#                                                         render chart variants in a process pool
+#   python scripts/mvw.py summary                         rebuild data/summary.json for the site
+#   python scripts/mvw.py bench run|compare ...            synthetic-history benchmark suite (bench_suite.py)
+#   python scripts/mvw.py status                          print the current leader of every bet
+#   python scripts/mvw.py daemon [--dry-run]              scheduler with warm state + /healthz, /metrics
+#   python scripts/mvw.py startup-check [--budget-ms N]   fail if `status` imports too much
+# Only the stdlib is imported at module level; each subcommand imports what it needs,
+# so `status` never pays for numpy/matplotlib/yfinance/pandas/requests.
+
+import argparse, sys
+from pathlib import Path
+
+STARTUP_BUDGET_MS = 50
+HEAVY_MODULES = {"numpy", "matplotlib", "pandas", "yfinance", "requests"}
+
+def cmd_fetch(args):
+    import fetch_caps
+    fetch_caps.main(["--backfill", args.backfill] if args.backfill else [])
+
+def cmd_report(args):
+    import email_report
+    email_report.main(dry_run=args.dry_run, html_out=args.html)
+
+def cmd_render(args):
+    import email_report
+    from bets import load_bets
+    bets = [b for b in load_bets() if not args.bet or b.id in args.bet]
+    if args.force:
+        for b in bets:
+            email_report.chart_hash_path(b.chart_path).unlink(missing_ok=True)
+    email_report.render_all(bets)
+
+def cmd_charts(args):
+    import render_farm
+    from bets import load_bets
+    bets = [b for b in load_bets() if not args.bet or b.id in args.bet]
+    render_farm.render_specs(render_farm.specs_for(bets, args.window or render_farm.WINDOWS,
+                                                   args.theme or tuple(render_farm.THEMES),
+                                                   args.scale or render_farm.SCALES))
+
+def cmd_summary(args):
+    from build_summary import SUMMARY_PATH, write_summary
+    print(f"Wrote {SUMMARY_PATH.name} ({write_summary()} bytes)")
+
+def cmd_bench(args):
+    import bench_suite
+    bench_suite.main(args.bench_args)
+
+def cmd_daemon(args):
+    import daemon
+    daemon.main(dry_run=args.dry_run)
+
+def cmd_status(args):
+    import history_store
+    from bets import load_bets
+    from email_report import days_left, money_str, pct_str
+    row = history_store.last_row()
+    if row is None:
+        raise SystemExit("No data rows")
+    for bet in load_bets():
+        a, b = row.get(bet.a.column), row.get(bet.b.column)
+        if a is None or b is None:
+            print(f"{bet.title}: no data for {row['date']}")
+            continue
+        a, b = float(a), float(b)
+        if a > b:   leader, ahead = bet.a.label, (a - b) / b
+        elif b > a: leader, ahead = bet.b.label, (b - a) / a
+        else:       leader, ahead = "Tied", 0.0
+        print(f"{bet.title} — {row['date']}: {leader} ahead by {pct_str(ahead)} "
+              f"({bet.b.ticker} {money_str(b)}, {bet.a.ticker} {money_str(a)}) • {days_left(bet.end_date)} days left")
+
+def import_profile(cmd):
+    """Top-level imports of `python -X importtime <cmd>`: ({name: cumulative ms}, every module name)."""
+    import subprocess
+    r = subprocess.run([sys.executable, "-X", "importtime", *cmd], capture_output=True, text=True)
+    if r.returncode != 0:
+        raise SystemExit(f"{' '.join(cmd)} failed:\n{r.stderr[-2000:]}")
+    top, names = {}, set()
+    for line in r.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):            # one space after "|" = top level, more = nested
+            top[name.strip()] = int(cumulative_us) / 1000
+        names.add(name.strip().split(".")[0])
+    return top, names
+
+def cmd_startup_check(args):
+    # Only count what `status` imports beyond a bare interpreter (site, encodings, ...)
+    bare, _ = import_profile(["-c", "pass"])
+    top, names = import_profile([str(Path(__file__).resolve()), "status"])
+    ms = sum(v for k, v in top.items() if k not in bare)
+    heavy = sorted(names & HEAVY_MODULES)
+    print(f"mvw status: {ms:.1f} ms of imports (budget {args.budget_ms:g} ms)")
+    if heavy:
+        raise SystemExit(f"mvw status imports heavy modules: {', '.join(heavy)}")
+    if ms > args.budget_ms:
+        raise SystemExit("mvw status is over its startup budget")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="mvw", description="Marty vs Winslow tooling")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("fetch", help="fetch today's market caps")
+    p.add_argument("--backfill", metavar="START..END",
+                   help="fill missing days in a date range from bulk price history (END defaults to today)")
+    p.set_defaults(func=cmd_fetch)
+
+    p = sub.add_parser("report", help="render + commit the chart and send the weekly email")
+    p.add_argument("--dry-run", action="store_true", help="build the HTML only: no render, git or email")
+    p.add_argument("--html", type=Path, help="also write the email HTML to this file")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("render", help="render the charts locally (cache-aware, no git)")
+    p.add_argument("--force", action="store_true", help="ignore the render cache")
+    p.add_argument("--bet", action="append", help="only this bet id (repeatable)")
+    p.set_defaults(func=cmd_render)
+
+    p = sub.add_parser("charts", help="render chart variants (window x theme x scale) in a process pool")
+    p.add_argument("--bet", action="append", help="only this bet id (repeatable)")
+    p.add_argument("--window", action="append", help="30d, 365d, ytd, all ... (repeatable; default 30d, 365d, all)")
+    p.add_argument("--theme", action="append", choices=["light", "dark"], help="repeatable; default both")
+    p.add_argument("--scale", action="append", type=int, help="1 or 2 = retina (repeatable; default both)")
+    p.set_defaults(func=cmd_charts)
+
+    p = sub.add_parser("summary", help="rebuild data/summary.json for the site")
+    p.set_defaults(func=cmd_summary)
+
+    p = sub.add_parser("bench", help="benchmark suite on synthetic histories (args are passed to bench_suite.py)")
+    p.add_argument("bench_args", nargs=argparse.REMAINDER)
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("daemon", help="run fetch and report on internal schedules in one warm process")
+    p.add_argument("--dry-run", action="store_true", help="no git; the report only builds the HTML")
+    p.set_defaults(func=cmd_daemon)
+
+    p = sub.add_parser("status", help="print the current leader of every bet")
+    p.set_defaults(func=cmd_status)
+
+    p = sub.add_parser("startup-check", help="check `mvw status` import time with -X importtime")
+    p.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    p.set_defaults(func=cmd_startup_check)
+
+    args = ap.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
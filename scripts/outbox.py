@@ -0,0 +1,94 @@
+# scripts/outbox.py
+# Durable outbox for the weekly email (append-only JSONL, MVW_OUTBOX or <repo>/.cache/outbox.jsonl).
+#   {"type": "message", "week": "2026-W42", "bet": id, "subject": ..., "html": ...}
+#       the rendered report, stored once per (week, bet) so a rerun re-sends the same bytes
+#   {"type": "state", "key": "2026-W42|<bet>|<email>", "state": "sent" | "failed", "ts": ..., "error": ...}
+#       delivery state per idempotency key (report week + bet + recipient); the last record wins
+# A rerun of the same week (workflow retry, crash after the chart commit) re-sends only keys
+# that are not "sent". Each record is fsync'ed as soon as its batch is answered, so at most the
+# batches still in flight (BREVO_CONCURRENCY) can be repeated after a hard crash.
+# A torn last line left by such a crash is ignored, and trimmed before the next append.
+
+import datetime as dt
+import json, os, time
+from pathlib import Path
+
+import durable
+
+ROOT = Path(__file__).resolve().parents[1]
+OUTBOX_PATH = Path(os.environ.get("MVW_OUTBOX", ROOT / ".cache" / "outbox.jsonl"))
+KEEP_WEEKS = 8
+
+def report_week(day: dt.date = None) -> str:
+    y, w, _ = (day or dt.date.today()).isocalendar()
+    return f"{y}-W{w:02d}"
+
+def key(week: str, bet_id: str, email: str) -> str:
+    return f"{week}|{bet_id}|{email.lower()}"
+
+class Outbox:
+    def __init__(self, path: Path = OUTBOX_PATH):
+        self.path = Path(path)
+        self.messages, self.states = {}, {}
+        self._torn = False
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        self._torn = True         # torn last line after a crash
+                        continue
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    if rec.get("type") == "message":
+                        self.messages[(rec["week"], rec["bet"])] = rec
+                    elif rec.get("type") == "state":
+                        self.states[rec["key"]] = rec
+
+    def _append(self, rec):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self._torn:                            # start on a new line, or the record is lost too
+            with open(self.path, "rb+") as f:
+                data = f.read()
+                f.truncate(data.rfind(b"\n") + 1)
+            self._torn = False
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def message(self, week: str, bet_id: str):
+        return self.messages.get((week, bet_id))
+
+    def add_message(self, week: str, bet_id: str, subject: str, html: str):
+        rec = {"type": "message", "week": week, "bet": bet_id, "subject": subject, "html": html}
+        self._append(rec)
+        self.messages[(week, bet_id)] = rec
+        return rec
+
+    def is_sent(self, week: str, bet_id: str, email: str) -> bool:
+        return self.states.get(key(week, bet_id, email), {}).get("state") == "sent"
+
+    def pending(self, week: str, bet_id: str, recipients):
+        """Recipients ({"email": ...}) that have not been sent this week's report yet."""
+        return [r for r in recipients if not self.is_sent(week, bet_id, r["email"])]
+
+    def record(self, week: str, bet_id: str, email: str, state: str, error: str = None):
+        rec = {"type": "state", "key": key(week, bet_id, email), "state": state, "ts": round(time.time())}
+        if error:
+            rec["error"] = error[:300]
+        self._append(rec)
+        self.states[rec["key"]] = rec
+
+    def compact(self, keep_weeks: int = KEEP_WEEKS):
+        """Rewrite the file keeping only the newest `keep_weeks` weeks (run after a completed send)."""
+        weeks = sorted({w for w, _ in self.messages} | {k.split("|", 1)[0] for k in self.states})[-keep_weeks:]
+        keep = set(weeks)
+        recs = [m for (w, _), m in self.messages.items() if w in keep]
+        recs += [s for k, s in self.states.items() if k.split("|", 1)[0] in keep]
+        with durable.atomic_write(self.path) as f:
+            f.writelines(json.dumps(r, separators=(",", ":")) + "\n" for r in recs)
+        self.messages = {k: v for k, v in self.messages.items() if k[0] in keep}
+        self.states = {k: v for k, v in self.states.items() if k.split("|", 1)[0] in keep}
+        self._torn = False
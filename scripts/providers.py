@@ -0,0 +1,150 @@
+# scripts/providers.py
+# Quote providers. A provider answers get(ticker, field) for the FIELDS below
+# (None = unknown) and has a `name`. market_cap() layers the price * shares
+# fallback on top, so every provider gets it for free. For backfills, a provider
+# also answers history(ticker, start, end) -> {iso_date: close} in one request.
+# reset() drops per-run state, so a long-running process (mvw daemon) can reuse a provider.
+#
+# Select one with MVW_PROVIDER (default "yfinance"):
+#   yfinance          live Yahoo Finance data
+#   file:<path>       JSON stand-in for offline runs:
+#                     {"BP": {"market_cap": 7.3e10, "last_price": 28.1, "shares": 2.6e9, "_delay": 0.5}, ...}
+#                     ("_delay" optionally simulates a slow answer, in seconds;
+#                      "_history": {"2025-05-02": 28.4, ...} feeds backfills)
+# Hedged requests: set MVW_HEDGE to a second spec (e.g. "yfinance" again, or a file)
+# and MVW_HEDGE_BUDGET (seconds, default 2). If the primary hasn't answered within
+# the budget, the secondary is queried in parallel and the first valid answer wins.
+
+import datetime as dt
+import json, os, queue, threading, time
+from pathlib import Path
+
+FIELDS = ("market_cap", "last_price", "shares")
+
+def _num(v):
+    try:
+        v = float(v)
+    except (TypeError, ValueError):
+        return None
+    return v if v == v and v > 0 else None      # drop NaN / zero / negative
+
+class YFinanceProvider:
+    name = "yfinance"
+
+    def __init__(self):
+        import yfinance as yf                    # heavy (pulls in pandas); only when actually used
+        self._yf = yf
+        self._tickers = {}
+
+    def reset(self):
+        """Forget per-ticker objects (fast_info caches its values); yfinance's HTTP session stays."""
+        self._tickers = {}
+
+    def get(self, ticker, field):
+        t = self._tickers.get(ticker)
+        if t is None:
+            t = self._tickers[ticker] = self._yf.Ticker(ticker)
+        return _num(getattr(t.fast_info, field, None))
+
+    def history(self, ticker, start, end):
+        # Unadjusted daily closes, end inclusive (yfinance's `end` is exclusive)
+        df = self._yf.Ticker(ticker).history(start=start.isoformat(),
+                                             end=(end + dt.timedelta(days=1)).isoformat(),
+                                             auto_adjust=False)
+        return {ts.date().isoformat(): v for ts, v in df["Close"].items() if _num(v)}
+
+class FileProvider:
+    name = "file"
+
+    def __init__(self, path):
+        self.path = path
+        self.reset()
+
+    def reset(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            self._quotes = json.load(f)
+
+    def get(self, ticker, field):
+        q = self._quotes.get(ticker) or {}
+        if q.get("_delay"):
+            time.sleep(float(q["_delay"]))
+        return _num(q.get(field))
+
+    def history(self, ticker, start, end):
+        hist = (self._quotes.get(ticker) or {}).get("_history") or {}
+        lo, hi = start.isoformat(), end.isoformat()
+        return {d: float(v) for d, v in hist.items() if lo <= d <= hi and _num(v)}
+
+class HedgedProvider:
+    """Ask `primary`; if it hasn't answered within `budget` seconds, also ask
+       `secondary` and return the first valid (non-None) answer from either."""
+
+    def __init__(self, primary, secondary, budget: float = 2.0):
+        self.primary, self.secondary, self.budget = primary, secondary, budget
+        self.name = f"hedged({primary.name},{secondary.name})"
+        self.hedged = 0                          # how many lookups needed the secondary
+
+    def reset(self):
+        self.primary.reset()
+        self.secondary.reset()
+
+    def get(self, ticker, field):
+        answers = queue.Queue()
+        _ask(self.primary, ticker, field, answers)
+        try:
+            v = answers.get(timeout=self.budget)
+            if v is not None:
+                return v
+            outstanding = 1                      # primary answered, but with nothing useful
+        except queue.Empty:
+            outstanding = 2                      # primary still running; race it
+        self.hedged += 1
+        _ask(self.secondary, ticker, field, answers)
+        for _ in range(outstanding):
+            v = answers.get()
+            if v is not None:
+                return v
+        return None
+
+    def history(self, ticker, start, end):
+        # Bulk downloads are one-off repairs, not latency-critical: plain failover
+        try:
+            closes = self.primary.history(ticker, start, end)
+        except Exception:
+            closes = None
+        return closes or self.secondary.history(ticker, start, end)
+
+def _ask(provider, ticker, field, answers):
+    def run():
+        try:
+            answers.put(provider.get(ticker, field))
+        except Exception:
+            answers.put(None)
+    # Daemon thread: the losing request must not hold up process exit
+    threading.Thread(target=run, daemon=True).start()
+
+def market_cap(provider, ticker):
+    # Prefer market_cap if present; fall back to price * shares if available
+    mc = provider.get(ticker, "market_cap")
+    if mc is None:
+        price = provider.get(ticker, "last_price")
+        shares = provider.get(ticker, "shares")
+        if price and shares:
+            mc = price * shares
+    return float(mc) if mc else None
+
+def make_provider(spec: str):
+    spec = (spec or "yfinance").strip()
+    if spec == "yfinance":
+        return YFinanceProvider()
+    if spec.startswith("file:"):
+        return FileProvider(Path(spec[len("file:"):]).expanduser())
+    raise ValueError(f"Unknown quote provider: {spec!r}")
+
+def provider_from_env():
+    primary = make_provider(os.environ.get("MVW_PROVIDER", "yfinance"))
+    hedge = os.environ.get("MVW_HEDGE", "").strip()
+    if not hedge:
+        return primary
+    budget = float(os.environ.get("MVW_HEDGE_BUDGET", "2"))
+    return HedgedProvider(primary, make_provider(hedge), budget)
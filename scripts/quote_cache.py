@@ -0,0 +1,97 @@
+# scripts/quote_cache.py
+# Persistent TTL cache for quote lookups, keyed by (provider, ticker, field).
+# Each field has its own TTL: shares outstanding barely moves, so it is kept for days.
+# Prices and market caps (PRICE_FIELDS) are always fetched live by CachedProvider: the key has
+# no row date, so an intraday rerun's quotes would otherwise be stored as the next day's close,
+# and a same-day rerun gains nothing (append_row already skips a stored date). Their answers
+# are still recorded, with a 12 h TTL, for callers that pass fresh=().
+# The file is size-bounded: least recently used entries are evicted on save.
+#
+#   MVW_CACHE_DIR   where quotes.json lives (default: <repo>/.cache)
+#   MVW_NO_CACHE=1  bypass the cache entirely
+
+import json, os, threading, time
+from pathlib import Path
+
+import durable
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = Path(os.environ.get("MVW_CACHE_DIR", ROOT / ".cache"))
+
+TTLS = {                      # seconds
+    "market_cap": 12 * 3600,
+    "last_price": 12 * 3600,
+    "shares":     7 * 86400,
+}
+MAX_ENTRIES = 512
+PRICE_FIELDS = ("market_cap", "last_price")
+
+class QuoteCache:
+    def __init__(self, path: Path = CACHE_DIR / "quotes.json", ttls=None, max_entries: int = MAX_ENTRIES):
+        self.path, self.ttls, self.max_entries = Path(path), ttls or TTLS, max_entries
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)     # key -> [value, stored_at, last_used]
+        except (FileNotFoundError, ValueError):
+            self._entries = {}
+
+    @staticmethod
+    def key(provider, ticker, field) -> str:
+        return f"{provider}|{ticker}|{field}"
+
+    def get(self, provider, ticker, field):
+        k, now = self.key(provider, ticker, field), time.time()
+        with self._lock:
+            e = self._entries.get(k)
+            if e is not None and now - e[1] <= self.ttls.get(field, 0):
+                e[2] = now
+                self.hits += 1
+                return e[0]
+            self.misses += 1
+            return None
+
+    def put(self, provider, ticker, field, value):
+        if value is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._entries[self.key(provider, ticker, field)] = [value, now, now]
+
+    def save(self):
+        with self._lock:
+            entries = self._entries
+            if len(entries) > self.max_entries:
+                keep = sorted(entries, key=lambda k: entries[k][2], reverse=True)[:self.max_entries]
+                entries = self._entries = {k: entries[k] for k in keep}
+            durable.write_text(self.path, json.dumps(entries, separators=(",", ":")))
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = f" ({self.hits / total:.0%} hit rate)" if total else ""
+        return f"Quote cache: {self.hits} hits, {self.misses} misses{rate}"
+
+class CachedProvider:
+    """Wraps a provider (see providers.py); answers from the cache when fresh.
+       Fields in `fresh` always go to the provider (their answers are still stored)."""
+
+    def __init__(self, inner, cache: QuoteCache, fresh=PRICE_FIELDS):
+        self.inner, self.cache, self.fresh = inner, cache, frozenset(fresh)
+        self.name = inner.name
+
+    def get(self, ticker, field):
+        v = None if field in self.fresh else self.cache.get(self.name, ticker, field)
+        if v is None:
+            v = self.inner.get(ticker, field)
+            self.cache.put(self.name, ticker, field, v)
+        return v
+
+    def history(self, ticker, start, end):
+        return self.inner.history(ticker, start, end)
+
+    def reset(self):
+        self.inner.reset()
+
+def cache_from_env():
+    return None if os.environ.get("MVW_NO_CACHE") else QuoteCache()
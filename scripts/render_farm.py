@@ -0,0 +1,121 @@
+# scripts/render_farm.py
+# Renders many chart variants in parallel: every (bet, window, theme, scale) ChartSpec.
+#   - worker processes start with matplotlib's Agg backend already imported and keep one
+#     ChartRenderer (chart_renderer.py) per style, updated in place for each spec
+#   - each worker memory-maps the history once (email_report.load_columns)
+#   - outputs are named <bet>-<window>-<theme>@<scale>x.<hash>.png, where the hash covers the
+#     data and every render parameter; an existing file with that name is reused, not redrawn
+#   - PNGs go through the same palette quantization as the email chart (chart_output.py)
+#   - images/charts/manifest.json maps each variant name to its current file and its size;
+#     files no longer referenced are removed
+# python scripts/mvw.py charts [--bet ID] [--window 30d] [--theme dark] [--scale 2]
+
+import json, os, time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import durable, email_report
+from bets import load_bets
+
+if TYPE_CHECKING:
+    from bets import Bet
+
+OUT_DIR = email_report.ROOT / "images" / "charts"
+WINDOWS = ("30d", "365d", "all")
+SCALES = (1, 2)                      # 2 = retina (same layout, twice the dpi)
+THEMES = {
+    "light": {},                     # the email chart's colors
+    "dark": {"bg_color": "#0b1220", "text_color": "#cbd5e1", "zero_color": "#475569", "grid_color": "#1f2937"},
+}
+
+@dataclass(frozen=True)
+class ChartSpec:
+    bet: "Bet"
+    window: str = "all"              # "30d", "365d", "ytd", ... or "all"
+    theme: str = "light"
+    scale: int = 1
+
+    @property
+    def name(self) -> str:
+        return f"{self.bet.id}-{self.window}-{self.theme}@{self.scale}x"
+
+    def params(self) -> dict:
+        p = {**email_report.chart_params(self.bet), **THEMES[self.theme]}
+        p["dpi"] = p["dpi"] * self.scale
+        p["max_points"] = p["max_points"] * self.scale
+        return p
+
+def specs_for(bets, windows=WINDOWS, themes=tuple(THEMES), scales=SCALES):
+    return [ChartSpec(b, w, t, s) for b in bets for w in windows for t in themes for s in scales]
+
+# ---------- worker ----------
+_worker = {}
+
+def _warm():
+    """Pool initializer: import pyplot with the Agg backend before the first job arrives."""
+    _worker["plt"] = email_report._pyplot()
+
+def render_spec(spec: ChartSpec, out_dir: Path = OUT_DIR):
+    """Render one variant unless its content-hashed file exists. Returns (name, entry, rendered)."""
+    if "plt" not in _worker:
+        _warm()
+    if "columns" not in _worker:
+        _worker["columns"] = email_report.load_columns()
+    adv = email_report.load_advantage(spec.bet, _worker["columns"])
+    adv = email_report.chart_view(adv, "" if spec.window == "all" else spec.window)
+    params = spec.params()
+    digest = email_report.chart_input_hash(adv, params)
+    path = out_dir / f"{spec.name}.{digest[:12]}.png"
+    entry = {"file": path.name, "hash": digest, "bet": spec.bet.id, "window": spec.window,
+             "theme": spec.theme, "scale": spec.scale,
+             "width": round(params["figsize"][0] * params["dpi"]), "height": round(params["figsize"][1] * params["dpi"])}
+    if path.exists():
+        entry["bytes"] = path.stat().st_size
+        return spec.name, entry, False
+    if not len(adv):
+        return spec.name, None, False
+    from chart_output import optimize_png
+    from chart_renderer import renderer_for
+    entry["bytes"] = durable.write_bytes(path, optimize_png(renderer_for(params).render(adv), params.get("png_colors", 0)))
+    return spec.name, entry, True
+
+# ---------- farm ----------
+def read_manifest(out_dir: Path = OUT_DIR) -> dict:
+    try:
+        return json.loads((out_dir / "manifest.json").read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def render_specs(specs, out_dir: Path = OUT_DIR, max_workers=email_report.RENDER_WORKERS) -> dict:
+    """Render `specs` across worker processes and update out_dir/manifest.json (entries for
+       variants not in `specs` are kept). Returns the updated manifest."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    if len(specs) <= 1:
+        results = [render_spec(s, out_dir) for s in specs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        workers = min(len(specs), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_warm) as pool:
+            results = list(pool.map(render_spec, specs, [out_dir] * len(specs)))
+    manifest = read_manifest(out_dir)
+    for name, entry, _ in results:
+        if entry is None:
+            manifest.pop(name, None)
+        else:
+            manifest[name] = entry
+    manifest = dict(sorted(manifest.items()))
+    durable.write_text(out_dir / "manifest.json", json.dumps(manifest, indent=1) + "\n")
+    keep = {e["file"] for e in manifest.values()}
+    for f in out_dir.glob("*.png"):
+        if f.name not in keep:
+            f.unlink()
+    rendered = sum(r for _, _, r in results)
+    total = sum(e["bytes"] for _, e, _ in results if e)
+    print(f"Charts: {rendered} rendered, {len(results) - rendered} unchanged, {total / 1000:.0f} KB "
+          f"in {time.perf_counter() - t0:.2f}s -> {out_dir.relative_to(email_report.ROOT)}/manifest.json")
+    return manifest
+
+if __name__ == "__main__":
+    render_specs(specs_for(load_bets()))
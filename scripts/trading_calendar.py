@@ -0,0 +1,60 @@
+# scripts/trading_calendar.py
+# NYSE trading days: weekdays minus the exchange's full-day holidays (rules below, observed
+# dates included) and one-off closures. Stdlib only.
+#   New Year's Day (Sat -> not observed, Sun -> Mon), MLK Day (3rd Mon Jan), Washington's
+#   Birthday (3rd Mon Feb), Good Friday, Memorial Day (last Mon May), Juneteenth (from 2022),
+#   Independence Day, Labor Day (1st Mon Sep), Thanksgiving (4th Thu Nov), Christmas
+#   (fixed-date holidays: Sat -> Fri, Sun -> Mon).
+# The daily job runs at 01:30 UTC, after the US close, so the row dated D holds the close of
+# the last session before D: a row carries a new session only if D − 1 was a trading day
+# (see new_session).
+
+import datetime as dt
+from functools import lru_cache
+
+CLOSURES = {dt.date(2018, 12, 5), dt.date(2025, 1, 9)}      # national days of mourning
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> dt.date:
+    """n-th `weekday` (Mon=0) of the month; n=-1 is the last one."""
+    if n > 0:
+        first = dt.date(year, month, 1)
+        return first + dt.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = dt.date(year + month // 12, month % 12 + 1, 1) - dt.timedelta(days=1)
+    return last - dt.timedelta(days=(last.weekday() - weekday) % 7)
+
+def _easter(year: int) -> dt.date:
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return dt.date(year, month, day + 1)
+
+def _observed(d: dt.date) -> dt.date:
+    return d - dt.timedelta(days=1) if d.weekday() == 5 else d + dt.timedelta(days=1) if d.weekday() == 6 else d
+
+@lru_cache(maxsize=None)
+def holidays(year: int) -> frozenset:
+    days = {_nth_weekday(year, 1, 0, 3), _nth_weekday(year, 2, 0, 3), _easter(year) - dt.timedelta(days=2),
+            _nth_weekday(year, 5, 0, -1), _observed(dt.date(year, 7, 4)), _nth_weekday(year, 9, 0, 1),
+            _nth_weekday(year, 11, 3, 4), _observed(dt.date(year, 12, 25))}
+    new_year = dt.date(year, 1, 1)
+    if new_year.weekday() != 5:                     # a Saturday New Year's Day is not observed
+        days.add(_observed(new_year))
+    if year >= 2022:
+        days.add(_observed(dt.date(year, 6, 19)))
+    return frozenset(days)
+
+def is_trading_day(d: dt.date) -> bool:
+    return d.weekday() < 5 and d not in holidays(d.year) and d not in CLOSURES
+
+def new_session(d: dt.date) -> bool:
+    """True if the daily row dated `d` can hold a close the previous day's row did not."""
+    return is_trading_day(d - dt.timedelta(days=1))
+
+def sessions(start: dt.date, end: dt.date):
+    """Trading days in [start, end]."""
+    return [d for d in (start + dt.timedelta(days=i) for i in range((end - start).days + 1)) if is_trading_day(d)]
@@ -0,0 +1,93 @@
+# tests/test_backfill.py
+# fetch_caps.backfill against a local fake provider (providers.FileProvider with "_history") and
+# a temporary history store: weekend and holiday gaps carry the previous close forward, the row
+# dated D holds the last close strictly before D, and nothing is filled past the newest close.
+#   python -m unittest discover -s tests
+
+import datetime as dt
+import json, sys, tempfile, unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import fetch_caps, history_store
+from providers import FileProvider
+
+D = dt.date.fromisoformat
+
+# Trading days around the observed July 4 holiday (Fri 2026-07-03 has no close)
+SESSIONS = ["2026-06-26", "2026-06-29", "2026-06-30", "2026-07-01", "2026-07-02",
+            "2026-07-06", "2026-07-07", "2026-07-08", "2026-07-09", "2026-07-10",
+            "2026-07-13", "2026-07-14"]
+
+def close(day: str) -> float:                  # "2026-07-02" -> 702.0, easy to read back from a cap
+    return float(day[5:7] + day[8:10])
+
+def file_provider(quotes):
+    path = Path(tempfile.mkdtemp()) / "quotes.json"
+    path.write_text(json.dumps(quotes))
+    return FileProvider(path)
+
+class BackfillTest(unittest.TestCase):
+    def setUp(self):
+        data = Path(tempfile.mkdtemp())
+        patches = {"DATA_DIR": data, "LOG_PATH": data / "history.jsonl", "INDEX_PATH": data / "history.idx",
+                   "EXPORT_PATH": data / "history.json", "SHARD_DIR": data / "history",
+                   "MANIFEST_PATH": data / "history" / "manifest.json", "LAYOUT": "calendar"}
+        for name, value in patches.items():
+            p = mock.patch.object(history_store, name, value)
+            p.start()
+            self.addCleanup(p.stop)
+        p = mock.patch.object(fetch_caps, "export")       # the site summary is not under test
+        self.export = p.start()
+        self.addCleanup(p.stop)
+        self.provider = file_provider({
+            "BP":   {"shares": 2, "_history": {d: close(d) for d in SESSIONS}},
+            "COIN": {"shares": 3, "_history": {d: close(d) + 1 for d in SESSIONS[:-1]}},   # one close behind
+        })
+
+    def backfill(self, start, end):
+        return fetch_caps.backfill(self.provider, ["BP", "COIN"], D(start), D(end))
+
+    def held_closes(self):
+        """date -> BP close each stored row was built from."""
+        return {r["date"]: r["bpMarketCap"] / 2 for r in history_store.read_rows()}
+
+    def test_weekend_gap_carries_friday_close(self):
+        self.assertEqual(self.backfill("2026-07-10", "2026-07-13"), 4)
+        self.assertEqual(self.held_closes(), {"2026-07-10": 709, "2026-07-11": 710,
+                                              "2026-07-12": 710, "2026-07-13": 710})
+        self.export.assert_called_once()
+
+    def test_gap_starting_on_holiday(self):
+        self.assertEqual(self.backfill("2026-07-03", "2026-07-07"), 5)
+        self.assertEqual(self.held_closes(), {"2026-07-03": 702, "2026-07-04": 702, "2026-07-05": 702,
+                                              "2026-07-06": 702, "2026-07-07": 706})
+
+    def test_row_holds_last_close_strictly_before_its_date(self):
+        self.backfill("2026-07-01", "2026-07-02")
+        rows = {r["date"]: r for r in history_store.read_rows()}
+        self.assertEqual(rows["2026-07-02"], {"date": "2026-07-02", "bpMarketCap": 701 * 2,
+                                              "coinMarketCap": 702 * 3})
+
+    def test_stops_at_newest_close(self):
+        # COIN's newest close is 07-13, so 07-14 is the last day either ticker can fill
+        self.assertEqual(self.backfill("2026-07-13", "2026-07-20"), 2)
+        self.assertEqual(self.held_closes(), {"2026-07-13": 710, "2026-07-14": 713})
+
+    def test_only_missing_days_are_filled(self):
+        history_store.append_row({"date": "2026-07-11", "bpMarketCap": 1, "coinMarketCap": 1})
+        self.assertEqual(self.backfill("2026-07-10", "2026-07-13"), 3)
+        self.assertEqual(self.held_closes()["2026-07-11"], 0.5)          # stored row wins
+        self.assertEqual(self.backfill("2026-07-10", "2026-07-13"), 0)
+        self.export.assert_called_once()
+
+    def test_missing_shares_fails(self):
+        p = file_provider({"BP": {"_history": {d: close(d) for d in SESSIONS}}})
+        with self.assertRaises(SystemExit):
+            fetch_caps.backfill(p, ["BP"], D("2026-07-10"), D("2026-07-13"))
+        self.assertEqual(history_store.read_rows(), [])
+
+if __name__ == "__main__":
+    unittest.main()
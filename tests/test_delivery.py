@@ -0,0 +1,125 @@
+# tests/test_delivery.py
+# delivery.BrevoClient against the local stand-in (scripts/fake_brevo.py): batching, per-recipient
+# messages, retrying only failed batches, and the rate limiter.
+#   python -m unittest discover -s tests
+
+import json, sys, tempfile, time, unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import fake_brevo
+from delivery import BrevoClient, RateLimiter, chunks
+
+MESSAGE = {"sender": {"email": "bot@example.com"}, "subject": "Weekly", "htmlContent": "<p>hi</p>"}
+
+def recipients(n):
+    return [{"email": f"r{i}@example.com"} for i in range(n)]
+
+class FakeBrevoTest(unittest.TestCase):
+    fail_every = 0
+
+    def setUp(self):
+        self.log = Path(tempfile.mkdtemp()) / "sent.jsonl"
+        self.server = fake_brevo.serve(port=0, log_path=self.log, fail_every=self.fail_every)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v3/smtp/email"
+        sleep = mock.patch("delivery.time.sleep")       # retry backoff, not the rate limiter's wait
+        sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def client(self, api_key="test", **kw):
+        c = BrevoClient(api_key, url=self.url, rate=0, **kw)
+        self.addCleanup(c.close)
+        return c
+
+    def logged(self):
+        if not self.log.exists():
+            return []
+        return [json.loads(ln) for ln in self.log.read_text().splitlines()]
+
+class BatchingTest(FakeBrevoTest):
+    def test_one_message_per_recipient_in_batches(self):
+        c = self.client(batch_size=3, concurrency=2)
+        result = c.send(MESSAGE, recipients(7))
+        self.assertEqual(sorted(result["sent"]), sorted(r["email"] for r in recipients(7)))
+        self.assertEqual(result["failed"], {})
+        payloads = self.logged()
+        self.assertEqual(sorted(len(p["messageVersions"]) for p in payloads), [1, 3, 3])
+        for p in payloads:
+            self.assertNotIn("to", p)                   # nobody shares a To: line
+            self.assertTrue(all(len(v["to"]) == 1 for v in p["messageVersions"]))
+            self.assertEqual(p["subject"], "Weekly")
+        self.assertEqual(c.requests_sent, 3)
+        self.assertEqual(c.retries, 0)
+
+    def test_on_result_once_per_batch(self):
+        seen = []
+        self.client(batch_size=2).send(MESSAGE, recipients(5), on_result=lambda b, ok, _: seen.append((len(b), ok)))
+        self.assertEqual(sorted(seen), [(1, True), (2, True), (2, True)])
+
+    def test_rejected_key_is_not_retried(self):
+        c = self.client(api_key="", batch_size=2)
+        result = c.send(MESSAGE, recipients(4))
+        self.assertEqual(result["sent"], [])
+        self.assertEqual(len(result["failed"]), 4)
+        self.assertTrue(all(e.startswith("401") for e in result["failed"].values()))
+        self.assertEqual((c.requests_sent, c.retries), (2, 0))
+
+class ResultOrderTest(unittest.TestCase):
+    def test_fast_batch_recorded_before_slow_batch_answers(self):
+        # The outbox records a batch in on_result; it must not wait for slower batches of the same round
+        c = BrevoClient("test", rate=0, batch_size=1, concurrency=2)
+        self.addCleanup(c.close)
+        def post(payload):
+            if payload["messageVersions"][0]["to"][0]["email"] == "r0@example.com":
+                time.sleep(0.5)
+            return True, False, "201"
+        seen, t0 = [], time.monotonic()
+        with mock.patch.object(c, "_post", post):
+            c.send(MESSAGE, recipients(2), on_result=lambda b, ok, _: seen.append((b[0]["email"], time.monotonic() - t0)))
+        self.assertEqual([e for e, _ in seen], ["r1@example.com", "r0@example.com"])
+        self.assertLess(seen[0][1], 0.25)
+
+class RetryTest(FakeBrevoTest):
+    fail_every = 3                                      # the 3rd request gets a 503
+
+    def test_only_failed_batches_are_retried(self):
+        c = self.client(batch_size=2, concurrency=3)
+        result = c.send(MESSAGE, recipients(6))
+        self.assertEqual(len(result["sent"]), 6)
+        self.assertEqual(result["failed"], {})
+        self.assertEqual((c.requests_sent, c.retries), (4, 1))
+        sent = [v["to"][0]["email"] for p in self.logged() for v in p["messageVersions"]]
+        self.assertEqual(sorted(sent), sorted(r["email"] for r in recipients(6)))   # nobody twice
+
+    def test_gives_up_after_max_tries(self):
+        c = self.client(batch_size=1, concurrency=1, max_tries=1)
+        result = c.send(MESSAGE, recipients(3))
+        self.assertEqual(len(result["sent"]), 2)
+        self.assertEqual(list(result["failed"]), ["r2@example.com"])
+        self.assertTrue(result["failed"]["r2@example.com"].startswith("503"))
+
+class RateLimiterTest(unittest.TestCase):
+    def test_spaces_calls(self):
+        limiter, t0 = RateLimiter(20), time.monotonic()
+        for _ in range(5):
+            limiter.wait()
+        self.assertGreaterEqual(time.monotonic() - t0, 4 / 20 - 0.01)   # first call is free
+
+    def test_zero_rate_is_unlimited(self):
+        limiter, t0 = RateLimiter(0), time.monotonic()
+        for _ in range(100):
+            limiter.wait()
+        self.assertLess(time.monotonic() - t0, 0.05)
+
+    def test_chunks(self):
+        self.assertEqual(chunks([1, 2, 3, 4, 5], 2), [[1, 2], [3, 4], [5]])
+        self.assertEqual(chunks([1, 2], 0), [[1], [2]])
+
+if __name__ == "__main__":
+    unittest.main()
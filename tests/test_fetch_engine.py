@@ -0,0 +1,59 @@
+# tests/test_fetch_engine.py
+# fetch_engine.fetch_all against a local fake quote provider (providers.FileProvider with
+# "_delay"), plus timeouts and failures of individual tickers.
+#   python -m unittest discover -s tests
+
+import json, sys, tempfile, time, unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from fetch_engine import fetch_all
+from providers import FileProvider, market_cap
+
+def file_provider(quotes):
+    path = Path(tempfile.mkdtemp()) / "quotes.json"
+    path.write_text(json.dumps(quotes))
+    return FileProvider(path)
+
+class FetchAllTest(unittest.TestCase):
+    def test_runs_tickers_concurrently(self):
+        quotes = {f"T{i}": {"market_cap": 1e9 * (i + 1), "_delay": 0.2} for i in range(8)}
+        p = file_provider(quotes)
+        t0 = time.monotonic()
+        caps = fetch_all(quotes, lambda t: market_cap(p, t), max_workers=8)
+        self.assertLess(time.monotonic() - t0, 0.2 * 8 / 2)    # serial would take 1.6s
+        self.assertEqual(caps, {t: q["market_cap"] for t, q in quotes.items()})
+
+    def test_price_times_shares_fallback(self):
+        p = file_provider({"BP": {"last_price": 30, "shares": 2e9}})
+        self.assertEqual(fetch_all(["BP"], lambda t: market_cap(p, t)), {"BP": 6e10})
+
+    def test_timeout_and_errors_map_to_none(self):
+        p = file_provider({"FAST": {"market_cap": 1e9}, "SLOW": {"market_cap": 2e9, "_delay": 2}})
+        def fetch(t):
+            if t == "BAD":
+                raise ConnectionError("boom")
+            return market_cap(p, t)
+        t0 = time.monotonic()
+        caps = fetch_all(["FAST", "SLOW", "BAD", "NONE"], fetch, timeout=0.3)
+        self.assertLess(time.monotonic() - t0, 1.5)              # did not wait for SLOW
+        self.assertEqual(caps, {"FAST": 1e9, "SLOW": None, "BAD": None, "NONE": None})
+
+    def test_timeout_counts_from_call_start(self):
+        # One worker: the second ticker waits in the queue longer than `timeout`, but its own call is fast
+        p = file_provider({"A": {"market_cap": 1e9, "_delay": 0.3}, "B": {"market_cap": 2e9, "_delay": 0.1}})
+        caps = fetch_all(["A", "B"], lambda t: market_cap(p, t), max_workers=1, timeout=0.6)
+        self.assertEqual(caps, {"A": 1e9, "B": 2e9})
+
+    def test_dedupes_and_keeps_order(self):
+        calls = []
+        caps = fetch_all(["B", "A", "B"], lambda t: calls.append(t) or t.lower())
+        self.assertEqual(list(caps), ["B", "A"])
+        self.assertEqual(sorted(calls), ["A", "B"])
+
+    def test_empty(self):
+        self.assertEqual(fetch_all([], lambda t: 1), {})
+
+if __name__ == "__main__":
+    unittest.main()
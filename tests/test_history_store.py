@@ -0,0 +1,97 @@
+# tests/test_history_store.py
+# The append-only log (scripts/history_store.py) in a temporary data directory: duplicate days,
+# and the in-place history.json append matching a full export byte for byte.
+#   python -m unittest discover -s tests
+
+import json, sys, tempfile, unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import history_store
+
+def row(day: int, bp: int = 100, coin: int = 200):
+    return {"date": f"2026-07-{day:02d}", "bpMarketCap": bp + day, "coinMarketCap": coin + day}
+
+class StoreTest(unittest.TestCase):
+    def setUp(self):
+        data = Path(tempfile.mkdtemp())
+        self.export = data / "history.json"
+        patches = {"DATA_DIR": data, "LOG_PATH": data / "history.jsonl", "INDEX_PATH": data / "history.idx",
+                   "EXPORT_PATH": self.export, "SHARD_DIR": data / "history",
+                   "MANIFEST_PATH": data / "history" / "manifest.json", "JSON_CHECKSUM": False}
+        for name, value in patches.items():
+            p = mock.patch.object(history_store, name, value)
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_append_skips_stored_days(self):
+        self.assertTrue(history_store.append_row(row(1)))
+        self.assertTrue(history_store.append_row(row(2)))
+        self.assertFalse(history_store.append_row(row(2)))
+        self.assertFalse(history_store.append_row(row(1)))
+        self.assertEqual([r["date"] for r in history_store.read_rows()], ["2026-07-01", "2026-07-02"])
+        self.assertEqual(history_store.last_date(), "2026-07-02")
+
+    def test_stale_index_does_not_duplicate(self):
+        # Crash between the fsync'ed append and the index rewrite: the index is one day behind
+        history_store.append_row(row(1))
+        history_store.append_row(row(2))
+        history_store._write_index("2026-07-01")
+        self.assertFalse(history_store.append_row(row(2)))
+        self.assertEqual(len(history_store.read_rows()), 2)
+
+    def test_torn_last_line_is_ignored_and_trimmed(self):
+        history_store.append_row(row(1))
+        with open(history_store.LOG_PATH, "a", encoding="utf-8") as f:
+            f.write('{"date":"2026-07-02","bpMa')
+        self.assertEqual(history_store.last_row(), row(1))
+        self.assertEqual(len(history_store.read_rows()), 1)
+        self.assertTrue(history_store.append_row(row(2)))
+        self.assertEqual(history_store.read_rows(), [row(1), row(2)])
+
+    def test_append_json_matches_full_export(self):
+        for d in range(1, 4):
+            history_store.append_row(row(d))
+        history_store.export_json(self.export)
+        for d in range(4, 7):
+            history_store.append_row(row(d))
+            self.assertTrue(history_store.append_json([row(d)], self.export))
+        appended = self.export.read_bytes()
+        history_store.export_json(self.export)
+        self.assertEqual(appended, self.export.read_bytes())
+        self.assertEqual(len(json.loads(appended)), 6)
+
+    def test_append_json_refuses_a_file_out_of_step(self):
+        for d in range(1, 3):
+            history_store.append_row(row(d))
+        history_store.export_json(self.export)
+        history_store.append_row(row(3))
+        history_store.append_row(row(4))                 # history.json missed day 3
+        self.assertFalse(history_store.append_json([row(4)], self.export))
+        self.assertFalse(history_store.append_json([row(5)], self.export / "missing"))
+        with mock.patch.object(history_store, "JSON_CHECKSUM", True):
+            self.assertFalse(history_store.append_json([row(3)], self.export))
+
+    def test_merge_rows_keeps_existing(self):
+        history_store.append_row(row(2))
+        added = history_store.merge_rows([row(1), row(2, bp=0), row(3)])
+        self.assertEqual(added, 2)
+        self.assertEqual(history_store.read_rows(), [row(1), row(2), row(3)])
+        self.assertEqual(history_store.last_date(), "2026-07-03")
+
+    def test_shards_follow_the_current_layout(self):
+        # 4-6 repeat Fri 3's values; none holds a new session (Fri 3 is the observed July 4 holiday)
+        days = [row(1), row(2), row(3), {**row(3), "date": "2026-07-04"}, {**row(3), "date": "2026-07-05"},
+                {**row(3), "date": "2026-07-06"}, row(7)]
+        history_store.merge_rows(days)
+        for layout, stored in (("calendar", 7), ("runs", 4), ("trading", 4)):
+            with mock.patch.object(history_store, "LAYOUT", layout):
+                history_store.export_shards()
+                manifest = history_store.read_manifest()
+                self.assertEqual((manifest["layout"], manifest["rows"]), (layout, stored))
+                self.assertEqual(history_store.read_range(calendar=True), days)
+
+if __name__ == "__main__":
+    unittest.main()
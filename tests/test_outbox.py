@@ -0,0 +1,108 @@
+# tests/test_outbox.py
+# outbox.Outbox in a temporary directory: a rerun of the same week re-sends only recipients not
+# yet sent (through email_report.send_email_with_brevo with a stub client), a torn last line is
+# ignored, and compact keeps only the newest weeks.
+#   python -m unittest discover -s tests
+
+import datetime as dt
+import json, sys, tempfile, unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import email_report
+from bets import Bet, Party
+from outbox import Outbox, report_week
+
+BET = Bet(id="test-bet", title="Test Bet", end_date=dt.date(2030, 5, 1),
+          a=Party("A", "COIN", "#184FF8"), b=Party("B", "BP", "#007F01"),
+          recipients="r0@example.com, R1@Example.com, r2@example.com")
+
+class StubClient:
+    """Answers one batch per recipient; emails in `fail` are rejected."""
+
+    def __init__(self, fail=()):
+        self.fail, self.asked = set(fail), []
+
+    def send(self, message, recipients, on_result=None):
+        result = {"sent": [], "failed": {}}
+        for r in recipients:
+            self.asked.append(r["email"])
+            ok = r["email"] not in self.fail
+            if ok:
+                result["sent"].append(r["email"])
+            else:
+                result["failed"][r["email"]] = "HTTP 500"
+            if on_result:
+                on_result([r], ok, None if ok else "HTTP 500")
+        return result
+
+class OutboxTest(unittest.TestCase):
+    def setUp(self):
+        self.path = Path(tempfile.mkdtemp()) / "outbox.jsonl"
+        p = mock.patch.object(email_report, "BREVO_API_KEY", "test")
+        p.start()
+        self.addCleanup(p.stop)
+
+    def send(self, client, week="2026-W29"):
+        return email_report.send_email_with_brevo("<p>hi</p>", bet=BET, client=client,
+                                                  outbox=Outbox(self.path), week=week, subject="Weekly")
+
+    def test_resume_skips_sent_recipients(self):
+        first = StubClient(fail={"R1@Example.com"})
+        with self.assertRaises(RuntimeError):
+            self.send(first)
+        self.assertEqual(first.asked, ["r0@example.com", "R1@Example.com", "r2@example.com"])
+
+        rerun = StubClient()                         # a fresh Outbox, read back from the file
+        self.assertEqual(self.send(rerun)["sent"], ["R1@Example.com"])
+        self.assertEqual(rerun.asked, ["R1@Example.com"])
+
+        done = StubClient()
+        self.assertEqual(self.send(done), {"sent": [], "failed": {}})
+        self.assertEqual(done.asked, [])
+
+        next_week = StubClient()
+        self.send(next_week, week="2026-W30")
+        self.assertEqual(len(next_week.asked), 3)
+
+    def test_is_sent_ignores_email_case(self):
+        box = Outbox(self.path)
+        box.record("2026-W29", BET.id, "R1@Example.com", "sent")
+        self.assertTrue(Outbox(self.path).is_sent("2026-W29", BET.id, "r1@example.com"))
+
+    def test_last_state_wins(self):
+        box = Outbox(self.path)
+        box.record("2026-W29", BET.id, "r0@example.com", "failed", "HTTP 500")
+        box.record("2026-W29", BET.id, "r0@example.com", "sent")
+        self.assertTrue(Outbox(self.path).is_sent("2026-W29", BET.id, "r0@example.com"))
+
+    def test_torn_last_line_is_ignored(self):
+        box = Outbox(self.path)
+        box.add_message("2026-W29", BET.id, "Weekly", "<p>hi</p>")
+        box.record("2026-W29", BET.id, "r0@example.com", "sent")
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"type":"state","key":"2026-W29|test-bet|r1@exa')
+        box = Outbox(self.path)
+        self.assertEqual(box.message("2026-W29", BET.id)["html"], "<p>hi</p>")
+        self.assertTrue(box.is_sent("2026-W29", BET.id, "r0@example.com"))
+        self.assertFalse(box.is_sent("2026-W29", BET.id, "r1@example.com"))
+        box.record("2026-W29", BET.id, "r1@example.com", "sent")     # appends after the torn line
+        self.assertTrue(Outbox(self.path).is_sent("2026-W29", BET.id, "r1@example.com"))
+
+    def test_compact_keeps_newest_weeks(self):
+        box = Outbox(self.path)
+        weeks = [report_week(dt.date(2026, 6, 1) + dt.timedelta(weeks=i)) for i in range(5)]
+        for w in weeks:
+            box.add_message(w, BET.id, "Weekly", w)
+            box.record(w, BET.id, "r0@example.com", "sent")
+        box.compact(keep_weeks=2)
+        for b in (box, Outbox(self.path)):
+            self.assertEqual(sorted(w for w, _ in b.messages), weeks[-2:])
+            self.assertEqual(sorted(k.split("|")[0] for k in b.states), weeks[-2:])
+        self.assertEqual(len(self.path.read_text().splitlines()), 4)
+        self.assertTrue(all(json.loads(ln) for ln in self.path.read_text().splitlines()))
+
+if __name__ == "__main__":
+    unittest.main()
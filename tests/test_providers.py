@@ -0,0 +1,72 @@
+# tests/test_providers.py
+# providers.HedgedProvider with two local fake providers (providers.FileProvider with "_delay"):
+# a primary slower than the budget is raced against the secondary, and a primary with no answer
+# falls through to the secondary.
+#   python -m unittest discover -s tests
+
+import datetime as dt
+import json, sys, tempfile, time, unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from providers import FileProvider, HedgedProvider
+
+def file_provider(quotes):
+    path = Path(tempfile.mkdtemp()) / "quotes.json"
+    path.write_text(json.dumps(quotes))
+    return FileProvider(path)
+
+class Broken:
+    name = "broken"
+
+    def get(self, ticker, field):
+        raise ConnectionError("boom")
+
+    def history(self, ticker, start, end):
+        raise ConnectionError("boom")
+
+class HedgedTest(unittest.TestCase):
+    def test_fast_primary_is_not_hedged(self):
+        secondary = file_provider({"BP": {"market_cap": 2e9}})
+        p = HedgedProvider(file_provider({"BP": {"market_cap": 1e9}}), secondary, budget=0.5)
+        self.assertEqual(p.get("BP", "market_cap"), 1e9)
+        self.assertEqual(p.hedged, 0)
+
+    def test_primary_slow_past_budget(self):
+        primary = file_provider({"BP": {"market_cap": 1e9, "_delay": 2}})
+        p = HedgedProvider(primary, file_provider({"BP": {"market_cap": 2e9}}), budget=0.1)
+        t0 = time.monotonic()
+        self.assertEqual(p.get("BP", "market_cap"), 2e9)
+        self.assertLess(time.monotonic() - t0, 1)                # did not wait for the primary
+        self.assertEqual(p.hedged, 1)
+
+    def test_slow_primary_still_wins_if_secondary_has_nothing(self):
+        primary = file_provider({"BP": {"market_cap": 1e9, "_delay": 0.3}})
+        p = HedgedProvider(primary, file_provider({}), budget=0.1)
+        self.assertEqual(p.get("BP", "market_cap"), 1e9)
+        self.assertEqual(p.hedged, 1)
+
+    def test_primary_answers_none(self):
+        p = HedgedProvider(file_provider({"BP": {}}), file_provider({"BP": {"shares": 3e9}}), budget=1)
+        t0 = time.monotonic()
+        self.assertEqual(p.get("BP", "shares"), 3e9)
+        self.assertLess(time.monotonic() - t0, 0.5)              # asked at once, not after the budget
+        self.assertEqual(p.hedged, 1)
+
+    def test_primary_raises(self):
+        p = HedgedProvider(Broken(), file_provider({"BP": {"last_price": 30}}), budget=1)
+        self.assertEqual(p.get("BP", "last_price"), 30)
+
+    def test_neither_answers(self):
+        p = HedgedProvider(file_provider({}), Broken(), budget=0.1)
+        self.assertIsNone(p.get("BP", "market_cap"))
+        self.assertEqual(p.hedged, 1)
+
+    def test_history_fails_over(self):
+        closes = {"2026-07-01": 30.0, "2026-07-02": 31.0}
+        p = HedgedProvider(Broken(), file_provider({"BP": {"_history": closes}}))
+        self.assertEqual(p.history("BP", dt.date(2026, 7, 1), dt.date(2026, 7, 2)), closes)
+
+if __name__ == "__main__":
+    unittest.main()
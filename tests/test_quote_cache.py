@@ -0,0 +1,83 @@
+# tests/test_quote_cache.py
+# quote_cache.QuoteCache in a temporary directory with a fake clock: per-field TTL expiry,
+# least-recently-used eviction on save, and CachedProvider always asking live for prices.
+#   python -m unittest discover -s tests
+
+import json, sys, tempfile, unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import quote_cache
+from providers import FileProvider
+from quote_cache import CachedProvider, QuoteCache
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        self.path = Path(tempfile.mkdtemp()) / "quotes.json"
+        self.clock = Clock()
+        p = mock.patch.object(quote_cache, "time", self.clock)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def test_per_field_ttl(self):
+        c = QuoteCache(self.path, ttls={"market_cap": 60, "shares": 3600})
+        c.put("file", "BP", "market_cap", 1e9)
+        c.put("file", "BP", "shares", 2e9)
+        self.clock.now += 60
+        self.assertEqual(c.get("file", "BP", "market_cap"), 1e9)      # exactly at the TTL: still fresh
+        self.clock.now += 1
+        self.assertIsNone(c.get("file", "BP", "market_cap"))
+        self.assertEqual(c.get("file", "BP", "shares"), 2e9)
+        self.clock.now += 3600
+        self.assertIsNone(c.get("file", "BP", "shares"))
+        self.assertEqual((c.hits, c.misses), (2, 2))
+
+    def test_field_without_ttl_expires_at_once(self):
+        c = QuoteCache(self.path, ttls={"shares": 3600})
+        c.put("file", "BP", "market_cap", 1e9)
+        self.clock.now += 1
+        self.assertIsNone(c.get("file", "BP", "market_cap"))
+
+    def test_none_is_not_stored(self):
+        c = QuoteCache(self.path)
+        c.put("file", "BP", "shares", None)
+        c.save()
+        self.assertEqual(json.loads(self.path.read_text()), {})
+
+    def test_save_evicts_least_recently_used(self):
+        c = QuoteCache(self.path, ttls={"shares": 3600}, max_entries=2)
+        for t in ("A", "B", "C"):
+            c.put("file", t, "shares", 1)
+            self.clock.now += 1
+        c.get("file", "A", "shares")             # A is now the most recently used; B the least
+        c.save()
+        reloaded = QuoteCache(self.path, ttls={"shares": 3600})
+        self.assertEqual(sorted(reloaded._entries), ["file|A|shares", "file|C|shares"])
+        self.assertEqual(reloaded.get("file", "A", "shares"), 1)
+
+    def test_corrupt_file_starts_empty(self):
+        self.path.write_text('{"file|BP|sha')
+        self.assertIsNone(QuoteCache(self.path).get("file", "BP", "shares"))
+
+    def test_cached_provider_fetches_prices_live(self):
+        quotes = Path(tempfile.mkdtemp()) / "quotes.json"
+        quotes.write_text(json.dumps({"BP": {"market_cap": 1e9, "shares": 2e9}}))
+        inner = FileProvider(quotes)
+        p = CachedProvider(inner, QuoteCache(self.path))
+        self.assertEqual((p.get("BP", "market_cap"), p.get("BP", "shares")), (1e9, 2e9))
+        quotes.write_text(json.dumps({"BP": {"market_cap": 3e9, "shares": 4e9}}))
+        inner.reset()
+        self.assertEqual(p.get("BP", "market_cap"), 3e9)                # live
+        self.assertEqual(p.get("BP", "shares"), 2e9)                    # cached
+
+if __name__ == "__main__":
+    unittest.main()